@@ -20,8 +20,9 @@
 """
 DeepInsightAgent — Phase 3: Multi-Agent Reflection Loop (SOTA)
 
-Implements a 3-stage Analyst → Skeptic → Synthesizer debate via sequential
-LLM calls with streaming cognitive trace events. Designed for the
+Implements a 3-stage Analyst → Skeptic → Synthesizer debate with streaming
+cognitive trace events. Analyst and Skeptic read the evidence concurrently;
+the Synthesizer arbitrates both once they land. Designed for the
 /query/agentic_action endpoint with the DEEP_INSIGHT intent.
 
 All calls use num_ctx: 4096 (VRAM safety per upgrade spec).
@@ -29,61 +30,160 @@ Model: qwen3:4b (configurable via Config)
 """
 
 import re
+import time
 import asyncio
-from typing import AsyncGenerator, Dict, Any, List, Optional
+import hashlib
+import unicodedata
+from collections import OrderedDict
+from typing import AsyncGenerator, Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
 from langchain_ollama import OllamaLLM
 from ..core.config import Config
+from ..core.ollama_client import get_ollama_llm
 from ..core.utils import logger
 
 
+# Prompt clock renders at minute resolution, so format it at most once per minute
+_NOW_CACHE: Optional[Tuple[int, str]] = None
+
+
+def _cached_now() -> str:
+    """Current time as rendered in the <system_info> block, memoized per wall-clock minute."""
+    global _NOW_CACHE
+    minute = int(time.time()) // 60
+    if _NOW_CACHE is not None and _NOW_CACHE[0] == minute:
+        return _NOW_CACHE[1]
+    rendered = datetime.now().strftime("%A, %B %d, %Y, %I:%M %p")
+    _NOW_CACHE = (minute, rendered)
+    return rendered
+
+
+# ─── Static prompt prefixes ─────────────────────────────────────────────────
+# SOTA Prefix-Cache Layout: role + mandates are byte-identical on every call and come
+# first; per-call variables (time, documents, history, evidence) are appended after
+# them, with the bulky evidence last. Ollama can then reuse the KV prefix instead of
+# re-prefilling the boilerplate, and nothing static is re-formatted per request.
+
+_ANALYST_PREFIX = """<role>
+You are the SpandaOS Analyst — a world-class evidence analyst. Your task is to produce a thorough, structured first-pass analysis of the provided document context.
+STAGE: ANALYST (Pass 1 of 3)
+</role>
+
+<analyst_mandates>
+1. COGNITION: Think step-by-step inside <thinking> tags first to map the key themes.
+2. STRUCTURE: Produce a structured analysis with clear sections: Key Findings, Themes, Evidence Quality.
+3. DEPTH: Surface non-obvious patterns and latent contradictions in the evidence.
+4. CITATIONS: Reference source documents where applicable using [[FileName]] notation.
+5. LENGTH: Aim for a substantive analysis of 300-500 words.
+</analyst_mandates>
+"""
+
+_SKEPTIC_PREFIX = """<role>
+You are the SpandaOS Skeptic — a rigorous devil's advocate. An independent analyst is drafting a first-pass report on the same evidence right now; your critique will be handed to the final synthesizer alongside it. Identify where this evidence is weak, ambiguous, or open to alternative interpretation.
+STAGE: SKEPTIC (Pass 2 of 3 — concurrent with Analyst)
+</role>
+
+<skeptic_mandates>
+1. COGNITION: Think critically inside <thinking> tags to pinpoint the 3 claims a naive reading would most likely overstate.
+2. CHALLENGE: For each weakness, provide a specific counter-argument or alternative interpretation.
+3. GAPS: Identify what evidence is missing or what questions remain unanswered.
+4. TONE: Intellectually rigorous but constructive. The goal is to strengthen the final insight.
+5. FORMAT: Output as a structured critique: [Weakness 1], [Weakness 2], [Weakness 3], [Open Questions].
+</skeptic_mandates>
+"""
+
+_SYNTH_PREFIX = """<role>
+You are the SpandaOS Synthesizer — the final arbitrator of intellectual debate. You have received an analyst's initial report and a skeptic's independent critique of the same evidence. Your task is to forge a final, authoritative, deeply nuanced insight that is stronger than either individual perspective.
+STAGE: SYNTHESIZER (Pass 3 of 3 — FINAL)
+</role>
+
+<synthesizer_mandates>
+1. COGNITION: Think inside <thinking> tags to identify what each side got right.
+2. SYNTHESIS: Merge both perspectives into a final insight that addresses the skeptic's challenges head-on.
+3. NARRATIVE: Write as a cinematic intelligence report — authoritative, flowing, not a list.
+4. CITATIONS: Use [[FileName]] notation for source attribution.
+5. CONCLUSION: End with a powerful 2-sentence executive summary of the most important takeaway.
+6. LENGTH: 400-600 words of final synthesized insight.
+</synthesizer_mandates>
+"""
+
+
 class DeepInsightAgent:
     """
     SOTA Multi-Agent Reflection Loop for Deep Insight generation.
 
     Stages:
     1. Analyst  — drafts the initial analysis of the provided context
-    2. Skeptic  — critically challenges the analyst's claims
+    2. Skeptic  — independently challenges the evidence (runs concurrently with the Analyst)
     3. Synthesizer — merges analysis + critique into a final, peer-reviewed insight
 
     Streams status events between each stage so the frontend Cognitive Trace
-    accordion can show live progress. Each LLM call uses qwen3:4b with
-    appropriate temperature settings optimized for its role.
+    accordion can show live progress. All stages share a single qwen3:4b client;
+    the role is carried entirely by the stage prompt.
     """
 
     # Ollama options for VRAM safety as per upgrade spec
     _SAFE_OPTIONS = {"num_ctx": 4096}
 
-    def __init__(self):
-        base_url = Config.ollama.BASE_URL
-        timeout = Config.ollama.TIMEOUT
-
-        # Analyst: Creative reasoning, moderate temperature for diverse connections
-        self._analyst_llm = OllamaLLM(
-            model=Config.ollama_multi_model.HEAVY_MODEL,
-            base_url=base_url,
-            timeout=timeout,
-        )
+    # Compiled once: stripped after every stage and on the final synthesis
+    _THINKING_RE = re.compile(r'<thinking>[\s\S]*?</thinking>')
 
-        # Skeptic: Slightly higher temp to surface unexpected challenges
-        self._skeptic_llm = OllamaLLM(
-            model=Config.ollama_multi_model.HEAVY_MODEL,
-            base_url=base_url,
-            timeout=timeout,
-        )
+    # SOTA Insight Cache: the agent is built per request, so the cache lives on the class.
+    # key = sha256(latest user query + doc_list + trimmed_ctx) → (stored_at, final_content).
+    # Exact hits only: a near-duplicate match cannot tell that the evidence changed.
+    _CACHE_MAX_ENTRIES = 64
+    _CACHE_TTL_S = 1800.0
+    _insight_cache: "OrderedDict[bytes, Tuple[float, str]]" = OrderedDict()
 
-        # Synthesizer: Lower temp for clean, authoritative final output
-        self._synthesizer_llm = OllamaLLM(
-            model=Config.ollama_multi_model.HEAVY_MODEL,
-            base_url=base_url,
-            timeout=timeout,
+    def __init__(self):
+        # One client for all three roles: they share HEAVY_MODEL and no per-role sampling
+        # options are set, so separate instances only tripled client/pool setup.
+        # Role-specific temperatures, if ever needed, belong in per-call astream options.
+        # The instance itself comes from a process-wide cache, as agents are built per request.
+        self._llm = get_ollama_llm(
+            Config.ollama_multi_model.HEAVY_MODEL,
+            Config.ollama.BASE_URL,
+            Config.ollama.TIMEOUT,
         )
 
-    @staticmethod
-    def _strip_thinking(text: str) -> str:
+    @classmethod
+    def _strip_thinking(cls, text: str) -> str:
         """Strip <thinking> blocks emitted by reasoning models."""
-        return re.sub(r'<thinking>[\s\S]*?</thinking>', '', text).strip()
+        return cls._THINKING_RE.sub('', text).strip()
+
+    @staticmethod
+    def _truncate(text: str, limit: int) -> str:
+        """
+        Prefix of at most `limit` chars that never strands a combining mark from its base
+        character (str slicing is code-point safe, but not grapheme safe). No copy when it fits.
+        """
+        if len(text) <= limit:
+            return text
+        cut = limit
+        while cut > 0 and unicodedata.combining(text[cut]):
+            cut -= 1
+        return text[:cut]
+
+    @classmethod
+    def _cache_lookup(cls, key: bytes) -> Optional[str]:
+        """Exact digest hit over live (non-expired) entries."""
+        now = time.monotonic()
+        for stale in [k for k, (ts, _) in cls._insight_cache.items() if now - ts > cls._CACHE_TTL_S]:
+            del cls._insight_cache[stale]
+
+        entry = cls._insight_cache.get(key)
+        if entry is None:
+            return None
+        cls._insight_cache.move_to_end(key)
+        return entry[1]
+
+    @classmethod
+    def _cache_store(cls, key: bytes, content: str) -> None:
+        cls._insight_cache[key] = (time.monotonic(), content)
+        cls._insight_cache.move_to_end(key)
+        while len(cls._insight_cache) > cls._CACHE_MAX_ENTRIES:
+            cls._insight_cache.popitem(last=False)
 
     async def _run_stage(
         self,
@@ -93,17 +193,18 @@ class DeepInsightAgent:
         check_abort_fn=None
     ) -> str:
         """Run a single LLM stage and collect the full response."""
-        full = ""
+        parts: List[str] = []
         try:
             async for chunk in llm.astream(prompt, config={"tags": [tag]}):
                 if check_abort_fn and check_abort_fn():
                     logger.info(f"DeepInsightAgent [{tag}]: Abort detected.")
                     break
-                full += chunk
+                parts.append(chunk)
         except Exception as e:
             logger.error(f"DeepInsightAgent [{tag}] error: {e}")
-            full = f"[{tag.capitalize()} encountered an error: {str(e)}]"
-        return self._strip_thinking(full)
+            return f"[{tag.capitalize()} encountered an error: {str(e)}]"
+        # Single join at the end — no quadratic re-copying on the per-token path
+        return self._strip_thinking("".join(parts))
 
     async def run(
         self,
@@ -120,108 +221,102 @@ class DeepInsightAgent:
           - {"type": "token", "token": str}                   — streaming tokens (synthesizer only)
           - {"type": "deep_insight_done", "content": str}     — completion signal
         """
-        now = datetime.now().strftime("%A, %B %d, %Y, %I:%M %p")
+        now = _cached_now()
         doc_list = ", ".join(document_names) if document_names else "the uploaded documents"
         # Trim context to avoid VRAM overflow
-        trimmed_ctx = context[:6000] if len(context) > 6000 else context
+        trimmed_ctx = self._truncate(context, 6000)
+        skeptic_ctx = self._truncate(trimmed_ctx, 3000)  # sliced once, reused by the Skeptic prompt
         recent_history = "\n".join([
             f"{m.get('role', 'user')}: {m.get('content', '')[:200]}"
             for m in (history or [])[-3:]
         ])
 
-        # ─── STAGE 1: ANALYST ────────────────────────────────────────────────
-        yield {"type": "thought", "agent": "🔬 Analyst", "action": "Drafting initial analysis from evidence..."}
+        # ─── INSIGHT CACHE: skip the 3-stage debate for an identical ask ───
+        # Keyed on the latest user turn too: a different question over the same evidence
+        # must not reuse an earlier synthesis.
+        latest_query = next(
+            (m.get("content", "") or "" for m in reversed(history or []) if m.get("role", "user") == "user"), ""
+        )
+        cache_key = hashlib.sha256(f"{latest_query}\x00{doc_list}\x00{trimmed_ctx}".encode("utf-8")).digest()
+        cached = self._cache_lookup(cache_key)
+        if cached is not None:
+            logger.info(f"DeepInsightAgent: Insight cache hit ({len(cached)} chars) — debate skipped.")
+            yield {"type": "thought", "agent": "✨ Synthesizer", "action": "Recalled a peer-reviewed insight for this evidence."}
+            yield {"type": "token", "token": cached}
+            yield {"type": "deep_insight_done", "content": cached}
+            return
 
-        analyst_prompt = f"""<role>
-You are the SpandaOS Analyst — a world-class evidence analyst. Your task is to produce a thorough, structured first-pass analysis of the provided document context.
-</role>
+        # ─── STAGES 1 + 2: ANALYST ∥ SKEPTIC ─────────────────────────────────
+        # SOTA: The Skeptic challenges the raw evidence rather than the Analyst's draft,
+        # so both Ollama streams are in flight together and only the Synthesizer waits.
+        yield {"type": "thought", "agent": "🔬 Analyst", "action": "Drafting initial analysis from evidence..."}
+        yield {"type": "thought", "agent": "⚔️ Skeptic", "action": "Challenging the evidence in parallel..."}
 
+        analyst_prompt = _ANALYST_PREFIX + f"""
 <system_info>
 CURRENT TIME: {now}
 DOCUMENTS: {doc_list}
-STAGE: ANALYST (Pass 1 of 3)
 </system_info>
 
-<context>
-{trimmed_ctx}
-</context>
-
 <conversation_history>
 {recent_history}
 </conversation_history>
 
-<analyst_mandates>
-1. COGNITION: Think step-by-step inside <thinking> tags first to map the key themes.
-2. STRUCTURE: Produce a structured analysis with clear sections: Key Findings, Themes, Evidence Quality.
-3. DEPTH: Surface non-obvious patterns and latent contradictions in the evidence.
-4. CITATIONS: Reference source documents where applicable using [[FileName]] notation.
-5. LENGTH: Aim for a substantive analysis of 300-500 words.
-</analyst_mandates>
+<context>
+{trimmed_ctx}
+</context>
 
 ANALYST REPORT:"""
 
-        analyst_report = await self._run_stage(
-            self._analyst_llm, analyst_prompt, "deep_insight_analyst", check_abort_fn
-        )
-
-        if check_abort_fn and check_abort_fn():
-            return
-
-        logger.info(f"DeepInsightAgent: Analyst stage complete ({len(analyst_report)} chars)")
-        yield {"type": "thought", "agent": "🔬 Analyst", "action": f"Analysis complete — {len(analyst_report.split())} word report drafted."}
-
-        # ─── STAGE 2: SKEPTIC ────────────────────────────────────────────────
-        yield {"type": "thought", "agent": "⚔️ Skeptic", "action": "Challenging the analyst's conclusions..."}
-
-        skeptic_prompt = f"""<role>
-You are the SpandaOS Skeptic — a rigorous devil's advocate. You have received an analyst's first-pass report and must identify its weaknesses, unsupported claims, and alternative interpretations.
-</role>
-
+        skeptic_prompt = _SKEPTIC_PREFIX + f"""
 <system_info>
 CURRENT TIME: {now}
 DOCUMENTS: {doc_list}
-STAGE: SKEPTIC (Pass 2 of 3)
 </system_info>
 
 <original_context>
-{trimmed_ctx[:3000]}
+{skeptic_ctx}
 </original_context>
 
-<analyst_report>
-{analyst_report}
-</analyst_report>
-
-<skeptic_mandates>
-1. COGNITION: Think critically inside <thinking> tags to pinpoint the 3 weakest claims.
-2. CHALLENGE: For each weakness, provide a specific counter-argument or alternative interpretation.
-3. GAPS: Identify what evidence is missing or what questions remain unanswered.
-4. TONE: Intellectually rigorous but constructive. The goal is to strengthen the final insight.
-5. FORMAT: Output as a structured critique: [Weakness 1], [Weakness 2], [Weakness 3], [Open Questions].
-</skeptic_mandates>
-
 SKEPTIC CRITIQUE:"""
 
-        skeptic_critique = await self._run_stage(
-            self._skeptic_llm, skeptic_prompt, "deep_insight_skeptic", check_abort_fn
-        )
-
-        if check_abort_fn and check_abort_fn():
-            return
+        analyst_task = asyncio.create_task(self._run_stage(
+            self._llm, analyst_prompt, "deep_insight_analyst", check_abort_fn
+        ))
+        skeptic_task = asyncio.create_task(self._run_stage(
+            self._llm, skeptic_prompt, "deep_insight_skeptic", check_abort_fn
+        ))
 
-        logger.info(f"DeepInsightAgent: Skeptic stage complete ({len(skeptic_critique)} chars)")
-        yield {"type": "thought", "agent": "⚔️ Skeptic", "action": f"Critique complete — {len(skeptic_critique.split())} word challenge filed."}
+        # Surface each stage's trace event as soon as it lands instead of in fixed order
+        pending = {analyst_task, skeptic_task}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if check_abort_fn and check_abort_fn():
+                        return
+                    result = task.result()
+                    if task is analyst_task:
+                        logger.info(f"DeepInsightAgent: Analyst stage complete ({len(result)} chars)")
+                        yield {"type": "thought", "agent": "🔬 Analyst", "action": f"Analysis complete — {len(result.split())} word report drafted."}
+                    else:
+                        logger.info(f"DeepInsightAgent: Skeptic stage complete ({len(result)} chars)")
+                        yield {"type": "thought", "agent": "⚔️ Skeptic", "action": f"Critique complete — {len(result.split())} word challenge filed."}
+        finally:
+            # Abort / client disconnect: never leave an orphaned Ollama stream running
+            for task in pending:
+                task.cancel()
+
+        analyst_report = analyst_task.result()
+        skeptic_critique = skeptic_task.result()
 
         # ─── STAGE 3: SYNTHESIZER ────────────────────────────────────────────
         yield {"type": "thought", "agent": "✨ Synthesizer", "action": "Forging final peer-reviewed insight from debate..."}
 
-        synthesizer_prompt = f"""<role>
-You are the SpandaOS Synthesizer — the final arbitrator of intellectual debate. You have received an analyst's initial report and a skeptic's critique. Your task is to forge a final, authoritative, deeply nuanced insight that is stronger than either individual perspective.
-</role>
-
+        synthesizer_prompt = _SYNTH_PREFIX + f"""
 <system_info>
 CURRENT TIME: {now}
 DOCUMENTS: {doc_list}
-STAGE: SYNTHESIZER (Pass 3 of 3 — FINAL)
 </system_info>
 
 <analyst_report>
@@ -232,35 +327,32 @@ STAGE: SYNTHESIZER (Pass 3 of 3 — FINAL)
 {skeptic_critique}
 </skeptic_critique>
 
-<synthesizer_mandates>
-1. COGNITION: Think inside <thinking> tags to identify what each side got right.
-2. SYNTHESIS: Merge both perspectives into a final insight that addresses the skeptic's challenges head-on.
-3. NARRATIVE: Write as a cinematic intelligence report — authoritative, flowing, not a list.
-4. CITATIONS: Use [[FileName]] notation for source attribution.
-5. CONCLUSION: End with a powerful 2-sentence executive summary of the most important takeaway.
-6. LENGTH: 400-600 words of final synthesized insight.
-</synthesizer_mandates>
-
 SpandaOS DEEP INSIGHT:"""
 
         # Stream the synthesizer response token by token (final output visible to user)
-        final_content = ""
+        final_parts: List[str] = []
+        synthesis_ok = True
         try:
-            async for chunk in self._synthesizer_llm.astream(
+            async for chunk in self._llm.astream(
                 synthesizer_prompt, config={"tags": ["deep_insight_synthesizer"]}
             ):
                 if check_abort_fn and check_abort_fn():
                     logger.info("DeepInsightAgent [Synthesizer]: Abort detected mid-stream.")
+                    synthesis_ok = False
                     break
-                final_content += chunk
+                final_parts.append(chunk)
                 yield {"type": "token", "token": chunk}
         except Exception as e:
             logger.error(f"DeepInsightAgent [Synthesizer] stream error: {e}")
-            final_content = analyst_report  # graceful fallback to analyst report
+            final_parts = [analyst_report]  # graceful fallback to analyst report
+            synthesis_ok = False
 
-        final_content = self._strip_thinking(final_content)
+        final_content = self._strip_thinking("".join(final_parts))
         final_content = final_content.replace("SpandaOS DEEP INSIGHT:", "").strip()
 
         logger.info(f"DeepInsightAgent: Synthesis complete ({len(final_content)} chars)")
+        # Cache-on-miss: only clean, complete syntheses are worth replaying
+        if synthesis_ok and final_content:
+            self._cache_store(cache_key, final_content)
         yield {"type": "thought", "agent": "✨ Synthesizer", "action": "Peer-reviewed insight forged. Debate concluded."}
         yield {"type": "deep_insight_done", "content": final_content}
@@ -17,10 +17,23 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from typing import List, Dict, Optional
+import asyncio
+from collections import OrderedDict
+from typing import List, Dict, Optional, Tuple
 from ..core.utils import logger
 from ..core.models import UnifiedEvidenceState
 
+# SOTA: Table-driven bucket routing shared by the enriched, legacy and registry passes.
+# Any type not listed here is text evidence.
+_TYPE_TO_BUCKET = {
+    # Visual perception
+    'image': 'visual', 'photo': 'visual', 'screenshot': 'visual', 'video': 'visual',
+    'vision': 'visual', 'ocr': 'visual', 'processed_narrative': 'visual',
+    'processed_description': 'visual', 'video_visual': 'visual',
+    # Audio intelligence
+    'audio': 'audio', 'audio_transcript': 'audio', 'audio_summary': 'audio', 'video_audio': 'audio',
+}
+
 class UniversalFusionExtractor:
     """
     SOTA component that aggregates multi-source file evidence.
@@ -29,6 +42,12 @@ class UniversalFusionExtractor:
     
     def __init__(self, db):
         self.db = db
+        # @mention fusions vs. those fully satisfied by enriched content (fallback short-circuit rate)
+        self._mention_fusions = 0
+        self._enriched_short_circuits = 0
+        # SOTA Fusion Cache: (conversation_id, targets) → (evidence table versions, fused state)
+        self._fusion_cache: "OrderedDict[Tuple[str, frozenset], Tuple[tuple, UnifiedEvidenceState]]" = OrderedDict()
+        self._fusion_cache_size = 32
         logger.info("UniversalMultimodalFusionExtractor initialized")
 
     async def extract_and_fuse(self, conversation_id: str, mentioned_files: list = None) -> UnifiedEvidenceState:
@@ -37,121 +56,169 @@ class UniversalFusionExtractor:
         Categorizes them into Text, Visual, and Audio buckets.
         Supports strict filtering by @mentioned files.
         """
+        # Normalize @mentions once: O(1) membership per item instead of a lowercase scan per target
+        targets = self._normalize_targets(mentioned_files)
+        
+        # Cache-first: reuse the last fusion for this chat + mention set while no evidence
+        # table has committed a new version since (any write anywhere bumps the stamp)
+        cache_key = (conversation_id, targets)
+        stamp = await asyncio.to_thread(self.db.get_evidence_version)
+        cached = self._fusion_cache.get(cache_key)
+        if stamp is not None and cached is not None and cached[0] == stamp:
+            self._fusion_cache.move_to_end(cache_key)
+            logger.info(f"Fusion Cache Hit: {conversation_id} (Mentions: {mentioned_files})")
+            return self._copy_state(cached[1])
+        
         logger.info(f"Fusing multimodal evidence for conversation: {conversation_id} (Mentions: {mentioned_files})")
+        state = await self._fuse(conversation_id, targets)
+        
+        if stamp is not None:
+            self._fusion_cache[cache_key] = (stamp, self._copy_state(state))
+            self._fusion_cache.move_to_end(cache_key)
+            while len(self._fusion_cache) > self._fusion_cache_size:
+                self._fusion_cache.popitem(last=False)
+        return state
+
+    @staticmethod
+    def _copy_state(state: UnifiedEvidenceState) -> UnifiedEvidenceState:
+        """Fresh bucket lists so callers can't mutate a cached state (cards are shared read-only)."""
+        return state.model_copy(update={
+            "text_evidence": list(state.text_evidence),
+            "visual_evidence": list(state.visual_evidence),
+            "audio_evidence": list(state.audio_evidence)
+        })
+
+    async def _fuse(self, conversation_id: str, targets: frozenset) -> UnifiedEvidenceState:
+        """Uncached fusion pass over enriched, legacy scraped and registry evidence."""
         state = UnifiedEvidenceState()
+        buckets = {"visual": state.visual_evidence, "audio": state.audio_evidence, "text": state.text_evidence}
         
         # 1. Fetch Unified Enriched Content (New Architecture)
-        enriched_items = self.db.get_enriched_content_by_chat(conversation_id)
+        # Blocking LanceDB scans run off the event loop. Without @mentions the enriched
+        # short-circuit can never fire, so the legacy/registry scans overlap with it.
+        evidence = None
+        if targets:
+            enriched_items = await asyncio.to_thread(self.db.get_enriched_content_by_chat, conversation_id)
+        else:
+            enriched_items, evidence = await asyncio.gather(
+                asyncio.to_thread(self.db.get_enriched_content_by_chat, conversation_id),
+                asyncio.to_thread(self.db.get_fused_evidence_by_chat, conversation_id, False)
+            )
         
         # Tracks for filename-based deduplication and legacy fallback
         fused_file_ids = set()
         seen_filenames = set()
+        # Lowercased FULL names of enriched cards (for the mention short-circuit).
+        # Base names are deliberately excluded: @cats may still match cats.jpg / cats.mp3
+        # assets that only the legacy and registry passes can supply.
+        covered = set()
         
+        # Per item: each field is read once and the file name lowercased once; the
+        # @mention filter is inlined as two set probes (same rule as _name_matches).
         for item in enriched_items:
-            f_id = item.get('file_id')
-            f_name = item.get('file_name', 'Unknown')
             content = item.get('enriched_content', '')
-            c_type = item.get('content_type', 'document').lower()
-            
             if not content: continue
-            if not self._name_matches(f_name, mentioned_files): continue
             
-            fused_file_ids.add(f_id)
+            f_name = item.get('file_name') or 'Unknown'
+            f_name_l = f_name.lower()
+            f_base_l = f_name_l.partition('.')[0]
+            if targets and f_name_l not in targets and f_base_l not in targets: continue
+            
+            fused_file_ids.add(item.get('file_id'))
             
             # SOTA Deduplication: One card per file name
             if f_name in seen_filenames:
                 continue
             seen_filenames.add(f_name)
+            covered.add(f_name_l)
+            
+            c_type = item.get('content_type', 'document').lower()
             
-            # Bucketize based on content type
-            if c_type in ['image', 'photo', 'screenshot', 'video']:
-                state.visual_evidence.append({
-                    "file_name": f_name,
-                    "content": content,
-                    "type": c_type
-                })
-            elif c_type == 'audio':
-                state.audio_evidence.append({
-                    "file_name": f_name,
-                    "content": content,
-                    "type": c_type
-                })
+            # Bucketize based on content type (one card dict per item, shape chosen by bucket)
+            bucket_key = _TYPE_TO_BUCKET.get(c_type, 'text')
+            if bucket_key == 'text':
+                state.text_evidence.append({"file_name": f_name, "text": content, "source": f_name})
             else:
-                state.text_evidence.append({
-                    "file_name": f_name,
-                    "text": content,
-                    "source": f_name
-                })
+                buckets[bucket_key].append({"file_name": f_name, "content": content, "type": c_type})
                 
+        # SOTA Short-Circuit: every @mention is an exact file name that already has an
+        # enriched card → the legacy and registry passes cannot add anything, so skip
+        # their DB reads entirely. Any bare base-name mention falls through.
+        if targets:
+            self._mention_fusions += 1
+            if targets <= covered:
+                self._enriched_short_circuits += 1
+                logger.info(
+                    f"Fusion Short-Circuit: enriched content covers all mentions "
+                    f"({self._enriched_short_circuits}/{self._mention_fusions} mention fusions). "
+                    f"{len(state.text_evidence)} text, {len(state.visual_evidence)} visual, {len(state.audio_evidence)} audio pieces."
+                )
+                return state
+        
+        # SOTA: One DB call for the remaining sources (shared asset scan, batched scraped lookup)
+        if evidence is None:
+            evidence = await asyncio.to_thread(self.db.get_fused_evidence_by_chat, conversation_id, False)
+        
         # 2. Fallback to Legacy Scraped Content (Backward Compatibility)
-        scraped_items = self.db.get_scraped_content_by_chat(conversation_id)
+        scraped_items = evidence["scraped"]
         legacy_seen_files = set()
         
         for item in scraped_items:
             f_id = item.get('file_id')
-            if f_id in fused_file_ids: continue 
-            
-            f_name = item.get('file_name', 'Unknown')
-            if not self._name_matches(f_name, mentioned_files): continue
+            if f_id in fused_file_ids or f_id in legacy_seen_files: continue
             
-            content = item.get('content', '')
-            if not content: continue
+            if targets:
+                f_name_l = (item.get('file_name') or 'Unknown').lower()
+                if f_name_l not in targets and f_name_l.partition('.')[0] not in targets: continue
             
-            metadata = item.get('metadata', {})
-            m_type = metadata.get('type', item.get('sub_type', 'text'))
+            if not item.get('content'): continue
             
-            if f_id in legacy_seen_files: continue
+            m_type = item.get('meta_type') or 'text'
             legacy_seen_files.add(f_id)
 
-            if m_type in ['vision', 'ocr', 'processed_narrative', 'processed_description', 'image', 'video_visual']:
-                state.visual_evidence.append(item)
-            elif m_type in ['audio_transcript', 'audio_summary', 'audio', 'video_audio']:
-                state.audio_evidence.append(item)
-            else:
-                state.text_evidence.append(item)
+            buckets[_TYPE_TO_BUCKET.get(m_type, 'text')].append(item)
 
         # 3. Supplemental: Ensure all registered assets are acknowledged
-        all_assets = self.db.get_documents_by_chat(conversation_id)
+        all_assets = evidence["assets"]
         for asset in all_assets:
             f_id = asset.get('id')
-            f_name = asset.get('file_name', 'Unknown')
-            f_type = asset.get('file_type', 'document').lower()
+            if f_id in fused_file_ids or f_id in legacy_seen_files: continue
             
-            if not self._name_matches(f_name, mentioned_files): continue
-            if f_name in seen_filenames or f_id in fused_file_ids or f_id in legacy_seen_files:
-                continue
+            f_name = asset.get('file_name') or 'Unknown'
+            if f_name in seen_filenames: continue
+            if targets:
+                f_name_l = f_name.lower()
+                if f_name_l not in targets and f_name_l.partition('.')[0] not in targets: continue
+            
+            f_type = asset.get('file_type', 'document').lower()
             
-            if f_type in ['image', 'photo', 'screenshot', 'video']:
-                state.visual_evidence.append({
-                    "file_name": f_name,
-                    "content": f"[Registry Match] {f_name} (Metadata only)",
-                    "type": f_type
-                })
-            elif f_type == 'audio':
-                state.audio_evidence.append({
-                    "file_name": f_name,
-                    "content": f"[Registry Match] {f_name} (Metadata only)",
-                    "type": f_type
-                })
+            bucket_key = _TYPE_TO_BUCKET.get(f_type, 'text')
+            if bucket_key == 'text':
+                state.text_evidence.append({"file_name": f_name, "text": f"[Registry Match] {f_name} is available in the knowledge base.", "source": f_name})
             else:
-                state.text_evidence.append({
-                    "file_name": f_name,
-                    "text": f"[Registry Match] {f_name} is available in the knowledge base.",
-                    "source": f_name
-                })
+                buckets[bucket_key].append({"file_name": f_name, "content": f"[Registry Match] {f_name} (Metadata only)", "type": f_type})
             
             seen_filenames.add(f_name)
 
         logger.info(f"Fusion Complete: {len(state.text_evidence)} text, {len(state.visual_evidence)} visual, {len(state.audio_evidence)} audio pieces.")
         return state
 
-    def _name_matches(self, fname: str, targets: list) -> bool:
-        """Helper to check if a file name matches any of the targets (strict or base match)."""
+    @staticmethod
+    def _normalize_targets(targets) -> frozenset:
+        """Lowercased frozenset of @mention targets, reusable across every _name_matches call."""
+        if not targets:
+            return frozenset()
+        if isinstance(targets, frozenset):
+            return targets
+        return frozenset(t.lower() for t in targets)
+
+    def _name_matches(self, fname: str, targets) -> bool:
+        """
+        Helper to check if a file name matches any of the targets (strict or base match).
+        `targets` is a list of names or a frozenset already built by _normalize_targets.
+        """
         if not targets: return True # No filter
+        target_set = self._normalize_targets(targets)
         fname_lower = fname.lower()
-        for t in targets:
-            t_lower = t.lower()
-            # Match strict filename or base name (e.g. @cats matching cats.pdf)
-            if fname_lower == t_lower or fname_lower.split('.')[0] == t_lower:
-                return True
-        return False
+        # Match strict filename or base name (e.g. @cats matching cats.pdf)
+        return fname_lower in target_set or fname_lower.split('.', 1)[0] in target_set
@@ -31,6 +31,9 @@ MENTION_PATTERN = re.compile(r'@([\w\- ]+(?:\.[\w\-]+)*)(?=\s|$|\?|!|[,;:])')
 def parse_mentions(query: str) -> list:
     """Extract @filename mentions from a query string.
     Returns a list of unique file names (case-preserved)."""
+    # Fast path: most queries carry no mention — skip the backtracking regex entirely
+    if '@' not in query:
+        return []
     matches = MENTION_PATTERN.findall(query)
     # Filter out common false positives (like bare @ followed by a space)
     return list(dict.fromkeys([m.strip() for m in matches if m.strip()]))
@@ -38,6 +41,8 @@ def parse_mentions(query: str) -> list:
 
 def strip_mentions(query: str) -> str:
     """Remove @filename mentions from query, leaving the clean question."""
+    if '@' not in query:
+        return query.strip()
     return MENTION_PATTERN.sub('', query).strip()
 
 
@@ -23,12 +23,14 @@ from langgraph.graph import StateGraph, END
 from langchain_ollama import OllamaLLM
 import json
 import asyncio
+import hashlib
 import re  # SOTA RE-Requirement
 from datetime import datetime
 
 from ..core.utils import logger
 from ..core.database import SpandaOSDatabase
 from ..core.config import Config
+from ..core.ollama_client import get_ollama_llm
 from ..core.memory import MemoryManager
 from .intent_classifier import IntentClassifier
 from .retriever import RetrieverAgent
@@ -48,6 +50,16 @@ ENGLISH_IDENTIFIERS: frozenset = frozenset({
 })
 # ─────────────────────────────────────────────────────────────────────────────
 
+
+def _evidence_key(text: Any, width: int = 100) -> bytes:
+    """
+    Fixed-size dedup key for an evidence shingle: 16-byte BLAKE2b of the
+    normalized (stripped + casefolded) leading `width` chars. Cheaper to hash and
+    compare in the seen-sets than the raw prefix strings, and case/whitespace-stable.
+    """
+    shingle = str(text or "").strip()[:width].casefold()
+    return hashlib.blake2b(shingle.encode("utf-8", "ignore"), digest_size=16).digest()
+
 # --- Specialized Internal Agents ---
 
 class GeneralIntelligenceAgent:
@@ -239,16 +251,16 @@ class MetacognitiveBrain:
         # (get_scraped_content_by_chat, get_scraped_content_by_filenames)
         self.sqlite_db = sqlite_db
         
-        # Initialize LLMs
-        self.llm_light = OllamaLLM(
-            model=Config.ollama_multi_model.LIGHTWEIGHT_MODEL,
-            base_url=Config.ollama.BASE_URL,
-            timeout=Config.ollama.TIMEOUT
+        # Initialize LLMs (shared with per-request agents via the process-wide client cache)
+        self.llm_light = get_ollama_llm(
+            Config.ollama_multi_model.LIGHTWEIGHT_MODEL,
+            Config.ollama.BASE_URL,
+            Config.ollama.TIMEOUT
         )
-        self.llm_heavy = OllamaLLM(
-            model=Config.ollama_multi_model.HEAVY_MODEL, 
-            base_url=Config.ollama.BASE_URL,
-            timeout=Config.ollama.TIMEOUT
+        self.llm_heavy = get_ollama_llm(
+            Config.ollama_multi_model.HEAVY_MODEL,
+            Config.ollama.BASE_URL,
+            Config.ollama.TIMEOUT
         )
         
         # Initialize Specialized Internal Agents
@@ -382,7 +394,8 @@ class MetacognitiveBrain:
         
         evidence = await self.extractor.extract_and_fuse(state["conversation_id"], mentioned_files=isolation_targets)
         telemetry.end_activity(tid)
-        return {"unified_evidence": evidence.dict()}
+        # Shallow field map: .dict() deep-copied every evidence dict the extractor just built
+        return {"unified_evidence": dict(evidence)}
 
     async def route_intent(self, state: SpandaOSState) -> Dict:
         """Wise Intent Routing."""
@@ -919,15 +932,16 @@ AUDIT RESULT:"""
             # 2. Augment with Fused Evidence (Surface/Multimodal Data)
             unified = state.get("unified_evidence", {})
             fused_evidence = []
-            seen_content = {str(e.get('text', ''))[:100] for e in evidence}
+            seen_content = {_evidence_key(e.get('text', '')) for e in evidence}
+            isolation_set = self.extractor._normalize_targets(isolation_targets)
             
             def add_fused(items, sub_type):
                 for item in items:
                     fname = item.get("file_name", "Unknown")
                     content = (item.get("content") or item.get("text") or "").strip()
-                    if content and content[:100] not in seen_content:
+                    if content and _evidence_key(content) not in seen_content:
                         # STRICT CHECK: Ensure the fused item matches isolation targets
-                        if self.extractor._name_matches(fname, isolation_targets):
+                        if self.extractor._name_matches(fname, isolation_set):
                             fused_evidence.append({
                                 "text": content,
                                 "file_name": fname,
@@ -1034,7 +1048,7 @@ AUDIT RESULT:"""
         for res in all_results:
             if isinstance(res, dict) and "evidence" in res:
                 for e in res["evidence"]:
-                    text_shingle = str(e.get("text", ""))[:100]
+                    text_shingle = _evidence_key(e.get("text", ""))
                     if text_shingle not in seen_texts:
                         seen_texts.add(text_shingle)
                         evidence.append(e)
@@ -1476,21 +1490,20 @@ AUDIT RESULT:"""
         fact_check = metadata.get("check", {})
         gaps = fact_check.get("unsupported_claims") or fact_check.get("factual_errors") or ["General low groundedness"]
         
-        # Prepare evidence string for healer with explicit source headers
-        evidence_parts = []
-        for e in state.get("evidence", []):
-            source = e.get("file_name") or e.get("source") or e.get("filename") or "Document"
-            text = e.get("text", "")
-            evidence_parts.append(f"[SOURCE: {source}]: {text}")
+        # Prepare evidence string for healer with explicit source headers.
+        # Each item is unpacked once into (source, text) tuples; the string is built in a single join.
+        text_cards = [
+            (e.get("file_name") or e.get("source") or e.get("filename") or "Document", e.get("text", ""))
+            for e in state.get("evidence", [])
+        ]
         
         # SOTA: Include visual evidence for the healer from perceived_media
-        seen_visual_sources = set()
-        for p in state.get("perceived_media", []):
-            source = p.get("file_name") or p.get("source") or "Visual Asset"
-            desc = p.get("content", "") or p.get("text", "")
-            if desc:
-                evidence_parts.append(f"[VISION_CARD: {source}]: {desc}")
-                seen_visual_sources.add(source)
+        vision_cards = [
+            (p.get("file_name") or p.get("source") or "Visual Asset", p.get("content", "") or p.get("text", ""))
+            for p in state.get("perceived_media", [])
+        ]
+        vision_cards = [card for card in vision_cards if card[1]]
+        seen_visual_sources = {source for source, _ in vision_cards}
         
         # SOTA Multimodal Fix: ALWAYS include unified_evidence.visual_evidence for the Healer.
         # Mirrors the same fix in self_critique — ensures the Healer has the full
@@ -1503,10 +1516,13 @@ AUDIT RESULT:"""
             if source not in seen_visual_sources:
                 desc = v.get("content", "") or v.get("text", "")
                 if desc:
-                    evidence_parts.append(f"[VISION_CARD: {source}]: {desc}")
+                    vision_cards.append((source, desc))
                     seen_visual_sources.add(source)
         
-        evidence_str = "\n\n".join(evidence_parts)
+        evidence_str = "\n\n".join(
+            [f"[SOURCE: {source}]: {text}" for source, text in text_cards]
+            + [f"[VISION_CARD: {source}]: {desc}" for source, desc in vision_cards]
+        )
         
         healed_answer, reasoning = await self.healer.heal(
             query=state["query"],
@@ -1623,7 +1639,8 @@ AUDIT RESULT:"""
             "mentioned_files": mentioned_files or [],
             "timestamp": datetime.utcnow().isoformat()
         }
-        self._persist_message(conversation_id, "user", persist_query, metadata=user_metadata)
+        # Embedding + LanceDB/SQLite writes are blocking — run them off the event loop
+        await asyncio.to_thread(self._persist_message, conversation_id, "user", persist_query, user_metadata)
         
         # 3. MemGPT Overflow Guard: Page out oldest turn if context budget exceeded
         # This is the core MemGPT mechanism — it fires before every LLM call.
@@ -1803,7 +1820,7 @@ AUDIT RESULT:"""
                     "target_language": target_lang,
                     "reasoning": last_state.get("reasoning") # SOTA Trace Persistence
                 }
-                self._persist_message(conversation_id, "assistant", final_answer, metadata=final_metadata)
+                await asyncio.to_thread(self._persist_message, conversation_id, "assistant", final_answer, final_metadata)
                 last_state["answer"] = final_answer # Sync for final yield
 
                 # ── SOTA Phase 2: Knowledge Distillation Sub-Agent Trigger ──
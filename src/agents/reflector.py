@@ -26,7 +26,8 @@ HuggingFace embeddings, and writes atomically to system_guidelines.json.
 
 Key design decisions:
   - schedule_reflection() returns IMMEDIATELY (fire-and-forget)
-  - asyncio.Semaphore(1) prevents concurrent JSON writes
+  - Feedback bursts are debounced into ONE read-modify-write + force_reload
+  - asyncio.Lock prevents concurrent JSON writes
   - Task registry (_background_tasks set) prevents GC of in-flight tasks
   - done-callback surfaces exceptions to logs (no silent swallowing)
   - os.replace() for atomic write (identical to GuidelinesManager's write path)
@@ -39,23 +40,156 @@ Embedding calls go via EmbeddingManager (HuggingFace, CPU) — NEVER Ollama.
 import os
 import re
 import json
+import heapq
+import logging
+import functools
 import uuid
 import asyncio
 import httpx
+import numpy as np
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from datetime import datetime, timezone, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Iterable
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, model_validator
 
 from ..core.utils import logger
 from ..core.config import Config
 from ..core.embedding_manager import detect_model_size
+from ..core.guidelines_manager import (
+    build_embedding_matrix, compact_rule_embedding, has_rule_embedding, quantize_int8
+)
 
 
 # =============================================================================
 # PYDANTIC SCHEMA FOR STRUCTURED OLLAMA OUTPUT
 # =============================================================================
 
+# Validator constants — built once at import, not per validation call
+_VALID_QUERY_TYPES: frozenset = frozenset({"factual", "reasoning", "multilingual", "technical", "creative", "general"})
+_RULE_MIN_WORDS = 15
+_RULE_MAX_WORDS = 150
+
+# Feedback types that count as a negative signal worth reflecting on
+_NEGATIVE_FEEDBACK_TYPES: frozenset = frozenset({"thumbs_down", "negative", "dislike", "bad", "0", "false"})
+
+# Keyword-dedup stopwords — one interned frozenset instead of a set literal per call
+_STOPWORDS: frozenset = frozenset({
+    "a", "an", "the", "is", "are", "was", "were", "be", "been", "being",
+    "have", "has", "had", "do", "does", "did", "will", "would", "could",
+    "should", "may", "might", "must", "can", "to", "of", "in", "for",
+    "on", "with", "at", "by", "from", "as", "it", "its", "that", "this",
+    "and", "or", "but", "not", "no", "so", "if", "when", "then", "than"
+})
+
+
+# Static reflection instructions — identical for every feedback
+_REFLECTION_SYSTEM_PROMPT = (
+    "You are a behavioral learning agent for an AI assistant. "
+    "Analyze the failed interaction and extract ONE specific, actionable "
+    "behavioral rule to prevent this failure in the future. "
+    "Output ONLY valid JSON matching this schema:\n"
+    '{"rule": "...", "query_type": "...", "language_hint": "...", '
+    '"source_summary": "...", "confidence_in_rule": 0.0}\n'
+    "No explanations, no markdown. Just the JSON object."
+)
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Leaked reasoning blocks, compiled once
+_THINK_RE = re.compile(r"<think>.*?</think>", re.DOTALL | re.IGNORECASE)
+
+
+def _extract_first_json_object(text: str) -> Optional[str]:
+    """
+    Returns the first balanced {...} object in text, or None.
+    Single O(len) pass tracking brace depth and string/escape state, so
+    truncated model output cannot trigger regex backtracking.
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
+def _encode_json(value: Any, indent_level: int = 0) -> bytes:
+    """Indented UTF-8 JSON for one value (orjson when available), re-indented to nest at indent_level."""
+    if ORJSON_AVAILABLE:
+        raw = orjson.dumps(value, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        raw = json.dumps(value, ensure_ascii=False, indent=2).encode("utf-8")
+    # Literal newlines only occur as formatting (string newlines are escaped)
+    return raw.replace(b"\n", b"\n" + b"  " * indent_level) if indent_level else raw
+
+
+def _iter_guidelines_chunks(data: dict):
+    """
+    Streams the guidelines document as indented JSON, one rule per chunk,
+    so the writer never holds the whole encoded file in memory.
+    """
+    yield b"{\n"
+    for key, value in data.items():
+        if key != "rules":
+            yield b"  " + _encode_json(key) + b": " + _encode_json(value, 1) + b",\n"
+    rules = data.get("rules", [])
+    if not rules:
+        yield b'  "rules": []\n}\n'
+        return
+    yield b'  "rules": [\n'
+    last = len(rules) - 1
+    for i, rule in enumerate(rules):
+        yield b"    " + _encode_json(rule, 2) + (b",\n" if i < last else b"\n")
+    yield b"  ]\n}\n"
+
+
+def _load_guidelines(raw: bytes) -> dict:
+    """Parse guidelines bytes; raises ValueError (JSONDecodeError) on malformed input."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+@functools.lru_cache(maxsize=256)
+def _rule_tokens(text: str) -> frozenset:
+    """Stopword-filtered token set of a rule, memoized by rule text (survives file re-reads)."""
+    return frozenset(text.lower().split()) - _STOPWORDS
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_utc(timestamp: str) -> datetime:
+    """ISO timestamp → aware UTC datetime, memoized (unchanged rules skip fromisoformat)."""
+    parsed = datetime.fromisoformat(timestamp)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
 class GeneratedRule(BaseModel):
     """Pydantic schema for structured LLM rule extraction via Ollama format=json."""
 
@@ -92,21 +226,18 @@ class GeneratedRule(BaseModel):
         description="Confidence this rule is useful and actionable, 0.1–1.0"
     )
 
-    @field_validator("rule")
-    @classmethod
-    def validate_rule_length(cls, v: str) -> str:
-        words = v.split()
-        if len(words) < 15:
-            raise ValueError(f"Rule too short: {len(words)} words (minimum 15)")
-        if len(words) > 150:
-            raise ValueError(f"Rule too long: {len(words)} words (maximum 150)")
-        return v
-
-    @field_validator("query_type")
-    @classmethod
-    def validate_query_type(cls, v: str) -> str:
-        valid = {"factual", "reasoning", "multilingual", "technical", "creative", "general"}
-        return v.lower() if v.lower() in valid else "general"
+    @model_validator(mode="after")
+    def _validate(self) -> "GeneratedRule":
+        """Single post-parse pass: enforce rule length, normalize query_type."""
+        word_count = len(self.rule.split())
+        if word_count < _RULE_MIN_WORDS:
+            raise ValueError(f"Rule too short: {word_count} words (minimum {_RULE_MIN_WORDS})")
+        if word_count > _RULE_MAX_WORDS:
+            raise ValueError(f"Rule too long: {word_count} words (maximum {_RULE_MAX_WORDS})")
+        
+        query_type = self.query_type.lower()
+        self.query_type = query_type if query_type in _VALID_QUERY_TYPES else "general"
+        return self
 
 
 # =============================================================================
@@ -126,8 +257,19 @@ class ReflectionAgent:
     # Class-level task registry — prevents GC of fire-and-forget tasks (CPython pattern)
     _background_tasks: set = set()
 
-    # Semaphore: only one reflection writes at a time (single-user, prevents JSON races)
-    _semaphore: asyncio.Semaphore = asyncio.Semaphore(1)
+    # Mutex: only one reflection writes at a time (single-user, prevents JSON races)
+    _write_lock: asyncio.Lock = asyncio.Lock()
+
+    # Debounce queue + its single drain task: a thumbs-down burst becomes one write
+    _pending_feedback: Optional[asyncio.Queue] = None
+    _drain_task: Optional[asyncio.Task] = None
+
+    # Rows per early-exit chunk in the embedding dedup scan
+    _DEDUP_CHUNK_ROWS: int = 16
+
+    # Pooled keep-alive client for Ollama, created lazily on the running event loop
+    _client: Optional[httpx.AsyncClient] = None
+    _client_loop: Optional[asyncio.AbstractEventLoop] = None
 
     def __init__(self, app_state: Any):
         """
@@ -136,10 +278,15 @@ class ReflectionAgent:
                        Must have: .guidelines_manager, .embedding_manager
         """
         self._app_state = app_state
+        # Local dedup index for rule sets GuidelinesManager hasn't loaded yet:
+        # (embedded active rule id set) → ((N, 384) int8 matrix, inverse norms, ids)
+        self._dedup_index: Optional[tuple] = None
+        # Authoritative guidelines dict from the last write/read + its (mtime_ns, size) token
+        self._cached_data: Optional[dict] = None
+        self._cached_stat: Optional[Tuple[int, int]] = None
         logger.info(
-            f"ReflectionAgent initialized | "
-            f"Model: {Config.learning.PRIMARY_OLLAMA_MODEL} | "
-            f"Guidelines: {Config.learning.GUIDELINES_PATH}"
+            "ReflectionAgent initialized | Model: %s | Guidelines: %s",
+            Config.learning.PRIMARY_OLLAMA_MODEL, Config.learning.GUIDELINES_PATH
         )
 
     # ── PUBLIC API ────────────────────────────────────────────────────
@@ -158,18 +305,46 @@ class ReflectionAgent:
         feedback_id = feedback_data.get("feedback_id") or str(uuid.uuid4())
         feedback_data["feedback_id"] = feedback_id
 
-        task = asyncio.create_task(
-            self._run_with_semaphore(feedback_data),
-            name=f"reflection_{feedback_id}"
-        )
+        # Cheap gate first: rejected feedback never allocates a task or takes the write lock
+        reason = self._quality_gate(feedback_data)
+        if reason:
+            logger.info("ReflectionAgent SKIP [%s]: %s", feedback_id, reason)
+            return
+
+        # Coalesce bursts: enqueue, and make sure exactly one drain task is running
+        if ReflectionAgent._pending_feedback is None:
+            ReflectionAgent._pending_feedback = asyncio.Queue()
+        ReflectionAgent._pending_feedback.put_nowait(feedback_data)
+
+        drain = ReflectionAgent._drain_task
+        if drain is None or drain.done():
+            task = asyncio.create_task(self._drain_loop(), name="reflection_drain")
+            ReflectionAgent._drain_task = task
 
-        # Store reference to prevent GC (CPython recommended pattern for fire-and-forget)
-        ReflectionAgent._background_tasks.add(task)
+            # Store reference to prevent GC (CPython recommended pattern for fire-and-forget)
+            ReflectionAgent._background_tasks.add(task)
 
-        # Done callback: removes from registry + surfaces exceptions to logs
-        task.add_done_callback(ReflectionAgent._task_done_callback)
+            # Done callback: removes from registry + surfaces exceptions to logs
+            task.add_done_callback(ReflectionAgent._task_done_callback)
+
+        logger.info(
+            "ReflectionAgent QUEUED | feedback_id=%s | pending=%d",
+            feedback_id, ReflectionAgent._pending_feedback.qsize()
+        )
 
-        logger.info(f"ReflectionAgent TASK_CREATED | feedback_id={feedback_id}")
+    @staticmethod
+    def _quality_gate(feedback_data: dict) -> Optional[str]:
+        """Returns a rejection reason for low-quality or non-negative feedback, else None."""
+        query = (feedback_data.get("query") or "").strip()
+        if len(query) < Config.learning.REFLECTION_MIN_QUERY_LEN:
+            return f"query too short ({len(query)} chars)"
+        response = (feedback_data.get("response") or "").strip()
+        if len(response) < Config.learning.REFLECTION_MIN_RESPONSE_LEN:
+            return f"response too short ({len(response)} chars)"
+        feedback_type = str(feedback_data.get("feedback_type", "")).lower()
+        if feedback_type not in _NEGATIVE_FEEDBACK_TYPES:
+            return f"not a negative feedback signal (type={feedback_type})"
+        return None
 
     @staticmethod
     def _task_done_callback(task: asyncio.Task) -> None:
@@ -178,7 +353,7 @@ class ReflectionAgent:
         try:
             task.result()  # re-raises exception if one occurred
         except asyncio.CancelledError:
-            logger.info(f"ReflectionAgent task cancelled: {task.get_name()}")
+            logger.info("ReflectionAgent task cancelled: %s", task.get_name())
         except Exception as e:
             logger.error(
                 f"ReflectionAgent task FAILED: {task.get_name()} | "
@@ -186,114 +361,160 @@ class ReflectionAgent:
                 exc_info=True
             )
 
-    # ── SEMAPHORE WRAPPER ─────────────────────────────────────────────
+    @classmethod
+    def _get_client(cls) -> httpx.AsyncClient:
+        """
+        Return the shared AsyncClient so retries and later reflections reuse
+        warm keep-alive connections. Rebuilt if closed or the loop changed.
+        """
+        loop = asyncio.get_running_loop()
+        if cls._client is None or cls._client.is_closed or cls._client_loop is not loop:
+            cls._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(120.0, connect=5.0),
+                limits=httpx.Limits(max_keepalive_connections=4, max_connections=8)
+            )
+            cls._client_loop = loop
+        return cls._client
 
-    async def _run_with_semaphore(self, feedback_data: dict) -> None:
-        """Ensures only one reflection write runs at a time."""
-        async with ReflectionAgent._semaphore:
-            await self._process(feedback_data)
+    # ── BATCH DRAIN ───────────────────────────────────────────────────
+
+    async def _drain_loop(self) -> None:
+        """
+        Waits one debounce window, drains everything queued, and reflects the
+        whole burst under the write lock. Exits once the queue stays empty.
+        """
+        queue = ReflectionAgent._pending_feedback
+        window = max(0, Config.learning.REFLECTION_BATCH_WINDOW_MS) / 1000.0
+
+        while not queue.empty():
+            await asyncio.sleep(window)  # let the rest of the burst arrive
+            batch: List[dict] = []
+            while True:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                async with ReflectionAgent._write_lock:
+                    await self._process_batch(batch)
+            except Exception as e:
+                # Keep draining — one bad batch must not strand later feedback.
+                # It may have half-mutated the cached rules, so force a re-read.
+                self._cached_data = None
+                logger.error(
+                    f"ReflectionAgent: batch of {len(batch)} failed: "
+                    f"{type(e).__name__}: {e}",
+                    exc_info=True
+                )
 
     # ── CORE PROCESSING ───────────────────────────────────────────────
 
-    async def _process(self, feedback_data: dict) -> None:
+    async def _process_batch(self, batch: List[dict]) -> None:
         """
-        Full reflection pipeline. Never call directly — use schedule_reflection().
+        Batched reflection pipeline. Never call directly — use schedule_reflection().
 
         Steps:
           1. Quality gate        — reject low-quality or non-negative feedback
-          2. Generate rule       — Ollama structured output, temperature=0
+          2. Generate rule       — Ollama structured output, temperature=0 (one feedback at
+                                   a time: the local model also serves chat)
           3. Post-gen validation — length, confidence checks
-          4. Load current rules  — sync read while holding semaphore
+          4. Load current rules  — ONE sync read while holding write lock
           5. Dedup               — embedding sim ≥ 0.82, or keyword fallback
+                                   (also against rules created earlier in this batch)
           6. Create/reinforce    — new rule or increment trigger_count
           7. Lifecycle           — retire stale rules, enforce cap
-          8. Atomic write        — write-to-temp → os.replace → force_reload
+          8. Atomic write        — ONE write-to-temp → os.replace → force_reload
         """
-        # ── STEP 1: Quality Gate ──────────────────────────────────────
+        # ── STEPS 1-3: Gate + generate + validate (sequential: one Ollama call at a time) ──
+        accepted = []
+        for fb in batch:
+            rule = await self._prepare_rule(fb)
+            if rule is not None:
+                accepted.append((fb.get("feedback_id", "n/a"), rule))
+        if not accepted:
+            return
+        logger.info("ReflectionAgent BATCH | feedback=%d | rules_to_merge=%d", len(batch), len(accepted))
+
+        # ── STEP 4: Load current guidelines (cache hit, or raw read off the loop) ──
+        loop = asyncio.get_running_loop()
+        current_data = await loop.run_in_executor(None, self._read_guidelines_raw)
+        # The rule list stays authoritative and is written back as-is; the id index
+        # only covers rules with a unique id (O(1) reinforce lookups)
+        rules: List[Dict] = list(current_data.get("rules", []))
+        rules_by_id: Dict[str, Dict] = {}
+        for rule in rules:
+            rule_id = rule.get("id")
+            if not rule_id:
+                logger.warning("ReflectionAgent: rule without id kept as-is | rule=%.60s", rule.get("rule", ""))
+            elif rule_id in rules_by_id:
+                logger.warning("ReflectionAgent: duplicate rule id=%s — first occurrence is reinforced", rule_id)
+            else:
+                rules_by_id[rule_id] = rule
+
+        # ── STEPS 5-6: Dedup + create/reinforce (sequential: later rules see earlier ones) ──
+        for feedback_id, generated_rule in accepted:
+            duplicate_id = await self._find_duplicate(generated_rule.rule, rules)
+
+            if duplicate_id:
+                self._reinforce_rule(rules_by_id, duplicate_id)
+            else:
+                new_rule = await self._create_rule_entry(generated_rule)
+                rules.append(new_rule)
+                rules_by_id[new_rule["id"]] = new_rule
+                logger.info(
+                    "ReflectionAgent NEW_RULE [%s] id=%s | type=%s | conf=%.2f | summary=%s",
+                    feedback_id, new_rule["id"], new_rule["query_types"],
+                    new_rule["confidence"], new_rule["source_summary"]
+                )
+
+        # ── STEP 7: Lifecycle Management ─────────────────────────────
+        self._run_lifecycle(rules)
+
+        # Migrate any legacy float embeddings to int8 as the file is rewritten
+        for rule in rules:
+            compact_rule_embedding(rule)
+
+        # ── STEP 8: Atomic Write (once per batch) ─────────────────────
+        success = await self._atomic_write(current_data, rules)
+
+        if success:
+            # Notify GuidelinesManager to reload immediately (bypasses TTL)
+            if hasattr(self._app_state, "guidelines_manager"):
+                await self._app_state.guidelines_manager.force_reload()
+
+    async def _prepare_rule(self, feedback_data: dict) -> Optional[GeneratedRule]:
+        """Steps 1-3 for one feedback: quality gate → Ollama rule → post-gen validation."""
+        # ── STEP 1: Quality Gate (defensive — schedule_reflection already gated) ──
+        feedback_id = feedback_data.get("feedback_id", "n/a")
+        reason = self._quality_gate(feedback_data)
+        if reason:
+            logger.info("ReflectionAgent SKIP [%s]: %s", feedback_id, reason)
+            return None
         query = (feedback_data.get("query") or "").strip()
         response = (feedback_data.get("response") or "").strip()
-        feedback_type = str(feedback_data.get("feedback_type", "")).lower()
-        feedback_id = feedback_data.get("feedback_id", "n/a")
-
-        if len(query) < Config.learning.REFLECTION_MIN_QUERY_LEN:
-            logger.info(
-                f"ReflectionAgent SKIP [{feedback_id}]: "
-                f"query too short ({len(query)} chars)"
-            )
-            return
-        if len(response) < Config.learning.REFLECTION_MIN_RESPONSE_LEN:
-            logger.info(
-                f"ReflectionAgent SKIP [{feedback_id}]: "
-                f"response too short ({len(response)} chars)"
-            )
-            return
-        if feedback_type not in {"thumbs_down", "negative", "dislike", "bad", "0", "false"}:
-            logger.info(
-                f"ReflectionAgent SKIP [{feedback_id}]: "
-                f"not a negative feedback signal (type={feedback_type})"
-            )
-            return
 
-        logger.info(f"ReflectionAgent START [{feedback_id}] | query={query[:60]}...")
+        logger.info("ReflectionAgent START [%s] | query=%.60s...", feedback_id, query)
 
         # ── STEP 2: Generate Rule via Ollama ──────────────────────────
         generated_rule = await self._generate_rule(query, response)
         if generated_rule is None:
-            return
+            return None
 
         # ── STEP 3: Post-Generation Validation ───────────────────────
         if generated_rule.confidence_in_rule < Config.learning.REFLECTION_MIN_CONFIDENCE:
             logger.info(
-                f"ReflectionAgent SKIP [{feedback_id}]: "
-                f"low confidence ({generated_rule.confidence_in_rule:.2f} < "
-                f"{Config.learning.REFLECTION_MIN_CONFIDENCE})"
-            )
-            return
-
-        words = generated_rule.rule.split()
-        if not (15 <= len(words) <= 150):
-            logger.info(
-                f"ReflectionAgent SKIP [{feedback_id}]: "
-                f"rule length invalid ({len(words)} words)"
+                "ReflectionAgent SKIP [%s]: low confidence (%.2f < %s)",
+                feedback_id, generated_rule.confidence_in_rule,
+                Config.learning.REFLECTION_MIN_CONFIDENCE
             )
-            return
+            return None
 
+        # Rule length (_RULE_MIN_WORDS.._RULE_MAX_WORDS) is enforced by GeneratedRule's validator
         if len(generated_rule.source_summary.split()) < 5:
-            logger.info(
-                f"ReflectionAgent SKIP [{feedback_id}]: source_summary too short"
-            )
-            return
-
-        # ── STEP 4: Load current guidelines ──────────────────────────
-        current_data = self._read_guidelines_raw()
-        rules = current_data.get("rules", [])
-
-        # ── STEP 5: Semantic Deduplication ────────────────────────────
-        duplicate_id = await self._find_duplicate(generated_rule.rule, rules)
-
-        if duplicate_id:
-            rules = self._reinforce_rule(rules, duplicate_id)
-        else:
-            new_rule = await self._create_rule_entry(generated_rule)
-            rules.append(new_rule)
-            logger.info(
-                f"ReflectionAgent NEW_RULE [{feedback_id}] "
-                f"id={new_rule['id']} | "
-                f"type={new_rule['query_types']} | "
-                f"conf={new_rule['confidence']:.2f} | "
-                f"summary={new_rule['source_summary']}"
-            )
-
-        # ── STEP 6: Lifecycle Management ─────────────────────────────
-        rules = self._run_lifecycle(rules)
+            logger.info("ReflectionAgent SKIP [%s]: source_summary too short", feedback_id)
+            return None
 
-        # ── STEP 7: Atomic Write ──────────────────────────────────────
-        success = await self._atomic_write(current_data, rules)
-
-        if success:
-            # Notify GuidelinesManager to reload immediately (bypasses TTL)
-            if hasattr(self._app_state, "guidelines_manager"):
-                await self._app_state.guidelines_manager.force_reload()
+        return generated_rule
 
     # ── RULE GENERATION VIA OLLAMA ────────────────────────────────────
 
@@ -301,22 +522,13 @@ class ReflectionAgent:
         """
         Calls Ollama with format='json' at temperature=0.
         Uses the PRIMARY model (same as Brain).
-        Retries once on failure.
+        Retries once: the second call starts when the first fails, or — if
+        REFLECTION_HEDGE_DELAY_S > 0 — when the first is still running after that delay.
         Parses and validates via Pydantic — rejects malformed/vague rules.
         """
         # Truncate to stay within token budget for local models
         truncated_response = response[:600]  # ~150 tokens — conservative for 4B/8B
 
-        system_prompt = (
-            "You are a behavioral learning agent for an AI assistant. "
-            "Analyze the failed interaction and extract ONE specific, actionable "
-            "behavioral rule to prevent this failure in the future. "
-            "Output ONLY valid JSON matching this schema:\n"
-            '{"rule": "...", "query_type": "...", "language_hint": "...", '
-            '"source_summary": "...", "confidence_in_rule": 0.0}\n'
-            "No explanations, no markdown. Just the JSON object."
-        )
-
         user_prompt = (
             f"Failed query: {query}\n\n"
             f"Failed response (truncated): {truncated_response}\n\n"
@@ -324,80 +536,99 @@ class ReflectionAgent:
             f"Extract one behavioral rule to improve future responses."
         )
 
-        full_prompt = f"SYSTEM: {system_prompt}\n\nUSER: {user_prompt}\n\nASSISTANT:"
+        full_prompt = f"SYSTEM: {_REFLECTION_SYSTEM_PROMPT}\n\nUSER: {user_prompt}\n\nASSISTANT:"
+
+        # Attempt-invariant request: built and encoded ONCE, shared by both attempts
+        payload = {
+            "model": Config.learning.PRIMARY_OLLAMA_MODEL,
+            "prompt": full_prompt,
+            "stream": False,
+            "format": "json",
+            "options": {
+                "temperature": 0.0,
+                "num_predict": 512,
+            }
+        }
+        body = (orjson.dumps(payload) if ORJSON_AVAILABLE
+                else json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+        url = f"{Config.ollama.BASE_URL}/api/generate"
+
+        # Retry on failure; optionally hedged: if attempt 1 is still running after the
+        # hedge delay, fire attempt 2 and take whichever returns a valid rule first.
+        hedge_delay = Config.learning.REFLECTION_HEDGE_DELAY_S
+        attempts = [asyncio.create_task(self._one_ollama_call(url, body, 1))]
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=hedge_delay if hedge_delay > 0 else None)
+            if done:
+                rule = attempts[0].result()
+                if rule is not None:
+                    return rule
+            else:
+                logger.info(
+                    "ReflectionAgent: attempt 1 still running after %.0fs — hedging with attempt 2",
+                    hedge_delay
+                )
 
-        model = Config.learning.PRIMARY_OLLAMA_MODEL
-        base_url = Config.ollama.BASE_URL
+            attempts.append(asyncio.create_task(self._one_ollama_call(url, body, 2)))
+            pending = {t for t in attempts if not t.done()}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    rule = task.result()
+                    if rule is not None:
+                        return rule
 
-        for attempt in range(2):
-            try:
-                payload = {
-                    "model": model,
-                    "prompt": full_prompt,
-                    "stream": False,
-                    "format": "json",
-                    "options": {
-                        "temperature": 0.0,
-                        "num_predict": 512,
-                    }
-                }
-
-                async with httpx.AsyncClient(timeout=httpx.Timeout(120.0, connect=5.0)) as client:
-                    http_response = await client.post(
-                        f"{base_url}/api/generate",
-                        json=payload
-                    )
-                    if http_response.status_code != 200:
-                        raise RuntimeError(
-                            f"Ollama API error: {http_response.status_code} — "
-                            f"{http_response.text[:200]}"
-                        )
-                    result = http_response.json()
-
-                raw_text = result.get("response", "")
-
-                # Strip thinking tags if model leaks them
-                raw_text = re.sub(
-                    r"<think>[\s\S]*?</think>", "", raw_text, flags=re.IGNORECASE
-                ).strip()
-
-                # Extract JSON object
-                json_match = re.search(r"\{[\s\S]*\}", raw_text)
-                if json_match:
-                    data = json.loads(json_match.group())
-                else:
-                    data = json.loads(raw_text)
-
-                rule = GeneratedRule.model_validate(data)
-                logger.info(
-                    f"ReflectionAgent: Rule generated | "
-                    f"type={rule.query_type} | "
-                    f"conf={rule.confidence_in_rule:.2f} | "
-                    f"words={len(rule.rule.split())}"
+            logger.error("ReflectionAgent: Rule generation failed after retry")
+            return None
+        finally:
+            # Loser (or abandoned) attempts are cancelled — frees the pooled connection
+            for task in attempts:
+                if not task.done():
+                    task.cancel()
+
+    async def _one_ollama_call(
+        self, url: str, body: bytes, attempt: int
+    ) -> Optional[GeneratedRule]:
+        """One Ollama generate + parse + validate. Returns None (logged) on any failure."""
+        try:
+            client = self._get_client()
+            http_response = await client.post(url, content=body, headers=_JSON_HEADERS)
+            if http_response.status_code != 200:
+                raise RuntimeError(
+                    f"Ollama API error: {http_response.status_code} — "
+                    f"{http_response.text[:200]}"
                 )
-                return rule
+            result = http_response.json()
 
-            except Exception as e:
-                if attempt == 0:
-                    logger.warning(
-                        f"ReflectionAgent: Rule generation failed (attempt 1): {e}. Retrying..."
-                    )
-                else:
-                    logger.error(
-                        f"ReflectionAgent: Rule generation failed after retry: {e}"
-                    )
-                    return None
+            raw_text = result.get("response", "")
 
-        return None
+            # Strip thinking tags if model leaks them
+            raw_text = _THINK_RE.sub("", raw_text).strip()
+
+            # Extract JSON object (linear bracket scan — no regex backtracking)
+            json_text = _extract_first_json_object(raw_text)
+            data = json.loads(json_text if json_text is not None else raw_text)
+
+            rule = GeneratedRule.model_validate(data)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "ReflectionAgent: Rule generated | attempt=%d | type=%s | conf=%.2f | words=%d",
+                    attempt, rule.query_type, rule.confidence_in_rule, len(rule.rule.split())
+                )
+            return rule
+
+        except Exception as e:
+            logger.warning("ReflectionAgent: Rule generation failed (attempt %d): %s", attempt, e)
+            return None
 
     # ── DEDUPLICATION ─────────────────────────────────────────────────
 
     async def _find_duplicate(
-        self, new_rule_text: str, existing_rules: List[Dict]
+        self, new_rule_text: str, existing_rules: Iterable[Dict]
     ) -> Optional[str]:
         """
         Returns id of duplicate rule if found, None otherwise.
-        Embedding dedup preferred (HuggingFace via run_in_executor).
+        Embedding dedup preferred (HuggingFace via encode_async).
         Keyword overlap fallback if EmbeddingManager unavailable.
         """
         active_rules = [r for r in existing_rules if r.get("status") == "active"]
@@ -407,45 +638,87 @@ class ReflectionAgent:
         embedding_manager = getattr(self._app_state, "embedding_manager", None)
 
         if embedding_manager and embedding_manager.is_ready:
-            # Run in executor — SentenceTransformer.encode is synchronous
+            # Micro-batched on the embedding thread — concurrent feedbacks share one pass
             loop = asyncio.get_running_loop()
-            new_embedding = await loop.run_in_executor(
-                None, embedding_manager.encode, new_rule_text
-            )
+            new_embedding = await embedding_manager.encode_async(new_rule_text)
 
             if new_embedding is not None:
                 threshold = Config.learning.EMBEDDING_SIMILARITY_THRESHOLD
-                for rule in active_rules:
-                    stored_emb = rule.get("embedding", [])
-                    if len(stored_emb) == 384:
-                        sim = embedding_manager.cosine_similarity(new_embedding, stored_emb)
-                        if sim >= threshold:
-                            logger.info(
-                                f"ReflectionAgent DEDUP: embedding match "
-                                f"id={rule['id']} sim={sim:.3f}"
-                            )
-                            return rule["id"]
+                matrix, inv_norms, ids = self._get_dedup_matrix(active_rules)
+                if matrix is None:
+                    return None
+                # int8 matrix-vector products over recency-ordered row chunks
+                idx, sim = await loop.run_in_executor(
+                    None, self._best_match, matrix, inv_norms, new_embedding, threshold
+                )
+                if idx >= 0 and sim >= threshold:
+                    logger.info("ReflectionAgent DEDUP: embedding match id=%s sim=%.3f", ids[idx], sim)
+                    return ids[idx]
                 return None
 
         # Keyword overlap fallback
         logger.debug("ReflectionAgent: Using keyword fallback for dedup")
         return self._keyword_dedup(new_rule_text, active_rules)
 
+    def _get_dedup_matrix(
+        self, active_rules: List[Dict]
+    ) -> Tuple[Optional[np.ndarray], Optional[np.ndarray], List[str]]:
+        """
+        Returns the (N, 384) int8 embedding matrix, inverse row norms and ids
+        for the active rules. Reuses GuidelinesManager's matrix when it holds
+        exactly these rules; otherwise (rules added earlier in this batch)
+        builds and caches a local one.
+        """
+        key = frozenset(r.get("id") for r in active_rules if has_rule_embedding(r))
+        guidelines_manager = getattr(self._app_state, "guidelines_manager", None)
+        if guidelines_manager is not None:
+            matrix, inv_norms, ids = guidelines_manager.get_embedding_matrix()
+            if len(ids) == len(key) and key.issuperset(ids):
+                return matrix, inv_norms, ids
+
+        if self._dedup_index is None or self._dedup_index[0] != key:
+            self._dedup_index = (key, *build_embedding_matrix(active_rules))
+        return self._dedup_index[1], self._dedup_index[2], self._dedup_index[3]
+
+    @staticmethod
+    def _best_match(
+        matrix: np.ndarray, inv_norms: np.ndarray, new_embedding: list, threshold: float
+    ) -> Tuple[int, float]:
+        """
+        Returns (row index, cosine) of the closest stored rule, or (-1, 0.0).
+        int8 dot products accumulate in int32; per-vector scales cancel in the cosine.
+        Rows are scanned in chunks (newest rules first) and the scan stops at
+        the first chunk whose best match already clears the threshold.
+        """
+        q_new, _ = quantize_int8(new_embedding)
+        if q_new.shape != (matrix.shape[1],):
+            return -1, 0.0
+        q_new = q_new.astype(np.int32)
+        norm = float(np.sqrt(q_new @ q_new))
+        if norm == 0.0:
+            return -1, 0.0
+
+        best_idx, best_sim = -1, -1.0
+        step = ReflectionAgent._DEDUP_CHUNK_ROWS
+        for start in range(0, matrix.shape[0], step):
+            stop = start + step
+            sims = (matrix[start:stop].astype(np.int32) @ q_new) * inv_norms[start:stop] / norm
+            local = int(sims.argmax())
+            sim = float(sims[local])
+            if sim > best_sim:
+                best_idx, best_sim = start + local, sim
+            if sim >= threshold:
+                break
+        return best_idx, max(-1.0, min(1.0, best_sim))  # clamp for float precision
+
     def _keyword_dedup(
         self, new_text: str, active_rules: List[Dict]
     ) -> Optional[str]:
         """Jaccard overlap deduplication using stopword-filtered token sets."""
-        STOPWORDS = {
-            "a", "an", "the", "is", "are", "was", "were", "be", "been", "being",
-            "have", "has", "had", "do", "does", "did", "will", "would", "could",
-            "should", "may", "might", "must", "can", "to", "of", "in", "for",
-            "on", "with", "at", "by", "from", "as", "it", "its", "that", "this",
-            "and", "or", "but", "not", "no", "so", "if", "when", "then", "than"
-        }
-        new_tokens = set(new_text.lower().split()) - STOPWORDS
+        new_tokens = _rule_tokens(new_text)
 
         for rule in active_rules:
-            existing_tokens = set(rule.get("rule", "").lower().split()) - STOPWORDS
+            existing_tokens = _rule_tokens(rule.get("rule", ""))
             if not new_tokens or not existing_tokens:
                 continue
             intersection = new_tokens & existing_tokens
@@ -453,29 +726,26 @@ class ReflectionAgent:
             overlap = len(intersection) / len(union) if union else 0
             if overlap >= 0.55:
                 logger.info(
-                    f"ReflectionAgent DEDUP (keyword): match "
-                    f"id={rule['id']} overlap={overlap:.3f}"
+                    "ReflectionAgent DEDUP (keyword): match id=%s overlap=%.3f", rule["id"], overlap
                 )
                 return rule["id"]
         return None
 
     # ── RULE REINFORCEMENT ────────────────────────────────────────────
 
-    def _reinforce_rule(self, rules: List[Dict], rule_id: str) -> List[Dict]:
-        """Increments trigger_count and boosts confidence for an existing rule."""
-        for rule in rules:
-            if rule.get("id") == rule_id:
-                old_conf = rule.get("confidence", 0.5)
-                rule["trigger_count"] = rule.get("trigger_count", 1) + 1
-                rule["confidence"] = round(min(1.0, old_conf + 0.08), 3)
-                rule["last_triggered"] = datetime.now(timezone.utc).isoformat()
-                logger.info(
-                    f"ReflectionAgent REINFORCE id={rule_id} | "
-                    f"conf={old_conf:.3f}→{rule['confidence']:.3f} | "
-                    f"count={rule['trigger_count']}"
-                )
-                break
-        return rules
+    def _reinforce_rule(self, rules_by_id: Dict[str, Dict], rule_id: str) -> None:
+        """Increments trigger_count and boosts confidence for an existing rule (O(1) lookup)."""
+        rule = rules_by_id.get(rule_id)
+        if rule is None:
+            return
+        old_conf = rule.get("confidence", 0.5)
+        rule["trigger_count"] = rule.get("trigger_count", 1) + 1
+        rule["confidence"] = round(min(1.0, old_conf + 0.08), 3)
+        rule["last_triggered"] = datetime.now(timezone.utc).isoformat()
+        logger.info(
+            "ReflectionAgent REINFORCE id=%s | conf=%.3f→%.3f | count=%d",
+            rule_id, old_conf, rule["confidence"], rule["trigger_count"]
+        )
 
     # ── NEW RULE CREATION ─────────────────────────────────────────────
 
@@ -485,16 +755,14 @@ class ReflectionAgent:
         embedding = []
 
         if embedding_manager and embedding_manager.is_ready:
-            loop = asyncio.get_running_loop()
-            result = await loop.run_in_executor(
-                None, embedding_manager.encode, generated.rule
-            )
+            result = await embedding_manager.encode_async(generated.rule)
             if result is not None:
                 embedding = result
 
         now = datetime.now(timezone.utc).isoformat()
 
-        return {
+        # Stored as base64 int8 + scale (embedding_q8 / embedding_scale) — compact JSON
+        return compact_rule_embedding({
             "id": str(uuid.uuid4()),
             "user_id": "default",          # multi-user hook — future: real user_id
             "rule": generated.rule,
@@ -509,70 +777,64 @@ class ReflectionAgent:
             "status": "active",
             "source_summary": generated.source_summary,
             "model_generated_by": Config.learning.PRIMARY_OLLAMA_MODEL,
-        }
+        })
 
     # ── LIFECYCLE MANAGEMENT ──────────────────────────────────────────
 
-    def _run_lifecycle(self, rules: List[Dict]) -> List[Dict]:
+    def _run_lifecycle(self, rules: List[Dict]) -> None:
         """
         Retirement check: stale + low-reinforcement rules → retired.
         Rule cap: hardware-aware maximum active count.
+        Mutates the rules in place.
         """
         now = datetime.now(timezone.utc)
         thirty_days_ago = now - timedelta(days=30)
+        model_size = detect_model_size(Config.learning.PRIMARY_OLLAMA_MODEL)
+        cap = 30 if model_size == "4B" else 50
 
-        # Retirement check: stale AND low-reinforcement
+        # Single pass: retire stale + low-reinforcement rules, collect survivors for the cap
+        active: List[Dict] = []
         for rule in rules:
             if rule.get("status") != "active":
                 continue
             last_triggered_str = rule.get("last_triggered", rule.get("created_at", ""))
             try:
-                last_triggered = datetime.fromisoformat(last_triggered_str)
-                if last_triggered.tzinfo is None:
-                    last_triggered = last_triggered.replace(tzinfo=timezone.utc)
-                if (last_triggered < thirty_days_ago
+                if (_parse_utc(last_triggered_str) < thirty_days_ago
                         and rule.get("trigger_count", 1) < 3):
                     rule["status"] = "retired"
                     logger.info(
-                        f"ReflectionAgent RETIRE id={rule['id']} | "
-                        f"reason=stale_low_reinforcement | "
-                        f"count={rule.get('trigger_count', 0)}"
+                        "ReflectionAgent RETIRE id=%s | reason=stale_low_reinforcement | count=%s",
+                        rule.get("id"), rule.get("trigger_count", 0)
                     )
+                    continue
             except (ValueError, TypeError):
                 pass
+            active.append(rule)
 
-        # Rule cap
-        model_size = detect_model_size(Config.learning.PRIMARY_OLLAMA_MODEL)
-        cap = 30 if model_size == "4B" else 50
-
-        active_rules = [r for r in rules if r.get("status") == "active"]
-        if len(active_rules) > cap:
-            active_rules.sort(key=lambda r: r.get("confidence", 0))
-            to_retire = len(active_rules) - cap
-            retired_count = 0
-            for rule in active_rules:
-                if retired_count >= to_retire:
-                    break
+        # Rule cap: retire only the `excess` lowest-confidence rules (O(N log excess), no full sort)
+        excess = len(active) - cap
+        if excess > 0:
+            lowest = heapq.nsmallest(
+                excess, active, key=lambda r: r.get("confidence", 0)
+            )
+            for rule in lowest:
                 rule["status"] = "retired"
                 logger.info(
-                    f"ReflectionAgent RETIRE id={rule['id']} | "
-                    f"reason=cap_exceeded | conf={rule.get('confidence', 0):.3f}"
+                    "ReflectionAgent RETIRE id=%s | reason=cap_exceeded | conf=%.3f",
+                    rule.get("id"), rule.get("confidence", 0)
                 )
-                retired_count += 1
             logger.info(
-                f"ReflectionAgent: Rule cap hit. Retired {retired_count} rules. "
-                f"Active count now at cap ({cap})."
+                "ReflectionAgent: Rule cap hit. Retired %d rules. Active count now at cap (%d).",
+                len(lowest), cap
             )
 
-        return rules
-
     # ── ATOMIC WRITE ──────────────────────────────────────────────────
 
     async def _atomic_write(
         self, original_data: dict, updated_rules: List[Dict]
     ) -> bool:
         """
-        Write-to-temp → os.replace() → atomic.
+        Write-to-temp → fsync → os.replace() → atomic and crash-durable.
         All file I/O runs in executor to avoid blocking the event loop.
         """
         path = Config.learning.GUIDELINES_PATH
@@ -586,37 +848,67 @@ class ReflectionAgent:
                 "rules": updated_rules,
             }
 
-            # Serialize in memory
-            json_str = json.dumps(updated_data, ensure_ascii=False, indent=2)
-
-            # Round-trip validation
-            test_parse = json.loads(json_str)
-            if "rules" not in test_parse:
-                raise ValueError("Round-trip validation failed: 'rules' key missing")
+            # Structural validation (replaces a full encode → parse round-trip)
+            if not isinstance(updated_rules, list):
+                raise ValueError("Validation failed: 'rules' is not a list")
+            if not all(isinstance(r, dict) for r in updated_rules):
+                raise ValueError("Validation failed: rule entry is not an object")
 
             loop = asyncio.get_running_loop()
 
-            # Write to temp (blocking I/O → executor)
+            # Stream-encode to temp (blocking I/O → executor), one rule at a time.
+            # fsync before the rename so os.replace never publishes a file whose
+            # data blocks are not on disk.
             def _write():
                 os.makedirs(os.path.dirname(path), exist_ok=True)
-                with open(temp_path, "w", encoding="utf-8") as f:
-                    f.write(json_str)
+                fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+                try:
+                    for chunk in _iter_guidelines_chunks(updated_data):
+                        view = memoryview(chunk)
+                        while view:
+                            view = view[os.write(fd, view):]
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
 
             await loop.run_in_executor(None, _write)
 
-            # Atomic rename
-            await loop.run_in_executor(None, os.replace, temp_path, path)
-
-            active_count = len([r for r in updated_rules if r.get("status") == "active"])
-            retired_count = len([r for r in updated_rules if r.get("status") == "retired"])
-            logger.info(
-                f"Guidelines saved. Active: {active_count} | "
-                f"Retired: {retired_count} | Total: {len(updated_rules)}"
-            )
+            # Atomic rename (+ directory fsync so the rename itself is durable)
+            def _replace():
+                os.replace(temp_path, path)
+                if os.name != "nt":  # directories cannot be opened for fsync on Windows
+                    try:
+                        dir_fd = os.open(os.path.dirname(path), os.O_RDONLY)
+                        try:
+                            os.fsync(dir_fd)
+                        finally:
+                            os.close(dir_fd)
+                    except OSError as e:
+                        logger.debug("ReflectionAgent: directory fsync skipped: %s", e)
+                return self._stat_key(path)
+
+            stat_key = await loop.run_in_executor(None, _replace)
+            # Rule set changed on disk → rebuild the dedup matrix on next use
+            self._dedup_index = None
+            # What we just wrote IS the file: next batch skips the re-read + parse
+            self._cached_data = updated_data
+            self._cached_stat = stat_key
+
+            # Status tally is two O(N) scans — only pay for it when INFO is on
+            if logger.isEnabledFor(logging.INFO):
+                active_count = sum(1 for r in updated_rules if r.get("status") == "active")
+                retired_count = sum(1 for r in updated_rules if r.get("status") == "retired")
+                logger.info(
+                    "Guidelines saved. Active: %d | Retired: %d | Total: %d",
+                    active_count, retired_count, len(updated_rules)
+                )
             return True
 
         except Exception as e:
             logger.error(f"ReflectionAgent: Atomic write FAILED: {e}", exc_info=True)
+            # The cached rules were mutated in place for this batch → no longer match disk
+            self._cached_data = None
+            self._cached_stat = None
             # Clean up temp file
             try:
                 if os.path.exists(temp_path):
@@ -625,17 +917,56 @@ class ReflectionAgent:
                 pass
             return False
 
-    # ── RAW READ (sync — only called while holding semaphore) ─────────
+    # ── RAW READ (sync, in executor — only called while holding write lock) ──
+
+    @staticmethod
+    def _stat_key(path: str) -> Optional[Tuple[int, int]]:
+        """(mtime_ns, size) change-detection token for the guidelines file."""
+        try:
+            st = os.stat(path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
 
     def _read_guidelines_raw(self) -> dict:
-        """Sync read of raw guidelines dict. Safe because we hold the semaphore."""
+        """
+        Sync read of raw guidelines dict. Safe because we hold the write lock.
+        Returns the in-memory copy from the last write unless the file's
+        (mtime, size) token shows an external edit.
+        """
+        path = Config.learning.GUIDELINES_PATH
+        stat_key = self._stat_key(path)
+        if stat_key is None:
+            self._cached_data = None
+            self._cached_stat = None
+            return {"schema_version": "2.0", "rules": []}
+        if self._cached_data is not None and stat_key == self._cached_stat:
+            return self._cached_data
         try:
-            with open(Config.learning.GUIDELINES_PATH, "r", encoding="utf-8") as f:
-                return json.load(f)
+            # Raw fd read: fstat gives the size (one preallocated read) and the
+            # token for exactly the bytes read; no text-mode decode pass
+            fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+            try:
+                st = os.fstat(fd)
+                chunks = []
+                remaining = st.st_size
+                while remaining > 0:
+                    chunk = os.read(fd, remaining)
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+                    remaining -= len(chunk)
+            finally:
+                os.close(fd)
+            data = _load_guidelines(chunks[0] if len(chunks) == 1 else b"".join(chunks))
+            self._cached_data = data
+            self._cached_stat = (st.st_mtime_ns, st.st_size)
+            return data
         except FileNotFoundError:
             return {"schema_version": "2.0", "rules": []}
-        except (json.JSONDecodeError, Exception) as e:
-            logger.error(f"ReflectionAgent: Raw read error: {e}")
+        except (OSError, ValueError) as e:
+            # I/O failure or malformed JSON (orjson/json decode errors are ValueErrors)
+            logger.error("ReflectionAgent: Raw read error: %s", e)
             return {"schema_version": "2.0", "rules": []}
 
     # ── GRACEFUL SHUTDOWN ─────────────────────────────────────────────
@@ -649,10 +980,9 @@ class ReflectionAgent:
         """
         pending = list(cls._background_tasks)
         if not pending:
+            await cls._close_client()
             return
-        logger.info(
-            f"ReflectionAgent: Waiting for {len(pending)} pending tasks on shutdown..."
-        )
+        logger.info("ReflectionAgent: Waiting for %d pending tasks on shutdown...", len(pending))
         try:
             await asyncio.wait_for(
                 asyncio.gather(*pending, return_exceptions=True),
@@ -663,3 +993,15 @@ class ReflectionAgent:
             logger.warning("ReflectionAgent: Shutdown timeout. Cancelling remaining tasks.")
             for task in pending:
                 task.cancel()
+        await cls._close_client()
+
+    @classmethod
+    async def _close_client(cls) -> None:
+        """Close the pooled Ollama client (application shutdown)."""
+        if cls._client is not None and not cls._client.is_closed:
+            try:
+                await cls._client.aclose()
+            except Exception as e:
+                logger.warning(f"ReflectionAgent: HTTP client close error: {e}")
+        cls._client = None
+        cls._client_loop = None
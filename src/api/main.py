@@ -429,6 +429,13 @@ async def lifespan(app: FastAPI):
     if app_state.db:
         app_state.db.disconnect()
 
+    # Release pooled Ollama keep-alive connections
+    try:
+        from ..core.ollama_client import close_http_pool
+        await close_http_pool()
+    except Exception as e:
+        logger.error(f"Shutdown: Ollama client cleanup error: {e}")
+
 
 # =============================================================================
 # FASTAPI APPLICATION
@@ -606,9 +613,11 @@ async def stream_query(request: QueryRequest):
                 # Save to DB as assistant message
                 try:
                     db = get_relational_db()
-                    db.add_message(conv_id, "user", request.query)
-                    db.add_message(conv_id, "assistant", IDENTITY_RESPONSE,
-                                   metadata={"intent": "IDENTITY", "confidence_score": 1.0})
+                    db.add_messages(conv_id, [
+                        {"role": "user", "content": request.query},
+                        {"role": "assistant", "content": IDENTITY_RESPONSE,
+                         "metadata": {"intent": "IDENTITY", "confidence_score": 1.0}},
+                    ])
                 except Exception:
                     pass
                 
@@ -804,9 +813,10 @@ async def agentic_action(request: AgenticActionRequest):
             # Persist the synthetic user message so history stays intact
             try:
                 from ..agents.intent_classifier import parse_mentions
-                app_state.brain._persist_message(
+                await asyncio.to_thread(
+                    app_state.brain._persist_message,
                     conv_id, "user", synthetic_query,
-                    metadata={"intent": request.intent, "agentic_action": True}
+                    {"intent": request.intent, "agentic_action": True}
                 )
             except Exception as persist_err:
                 logger.warning(f"AgenticAction: Failed to persist synthetic user msg: {persist_err}")
@@ -851,9 +861,10 @@ async def agentic_action(request: AgenticActionRequest):
                     final_content = event.get("content", "")
                     # Persist the final assistant message
                     try:
-                        app_state.brain._persist_message(
+                        await asyncio.to_thread(
+                            app_state.brain._persist_message,
                             conv_id, "assistant", final_content,
-                            metadata={"intent": request.intent, "agentic_action": True, "confidence_score": 0.9}
+                            {"intent": request.intent, "agentic_action": True, "confidence_score": 0.9}
                         )
                     except Exception as persist_err:
                         logger.warning(f"AgenticAction: Failed to persist assistant msg: {persist_err}")
@@ -994,9 +1005,11 @@ async def get_guidelines_admin():
 
     stats = app_state.guidelines_manager.get_stats()
 
-    # Strip embedding vectors from output (384 floats = noise for humans)
+    from ..core.guidelines_manager import EMBEDDING_KEYS
+
+    # Strip embedding vectors from output (384 numbers = noise for humans)
     def strip_embedding(rule: dict) -> dict:
-        return {k: v for k, v in rule.items() if k != "embedding"}
+        return {k: v for k, v in rule.items() if k not in EMBEDDING_KEYS}
 
     all_rules = app_state.guidelines_manager._rules  # type: ignore[attr-defined]
     active = sorted(
@@ -1218,25 +1231,43 @@ async def upload_file(
             )
             await index_documents(idx_req)
             
-            # Route extracted images to Multimodal Pipeline
-            for img_info in image_metadata:
+            # Route extracted images to Multimodal Pipeline.
+            # Images are independent, so overlap their hashing/OCR/DB work; the
+            # semaphore keeps at most a few in flight to respect the 6GB VRAM budget.
+            img_semaphore = asyncio.Semaphore(3)
+
+            async def _process_extracted_image(img_info: Dict):
                 img_path = img_info['path']
                 img_name = os.path.basename(img_path)
                 ocr_text = img_info.get('ocr_text', '')
                 
-                # SOTA: Pass precomputed OCR to skip redundant VLM hit
-                await app_state.multimodal_manager.process_file(
-                    conversation_id=chat_id,
-                    file_path=img_path,
-                    file_type=img_name.split('.')[-1],
-                    file_name=img_name,
-                    precomputed_items=[{"content": ocr_text, "sub_type": "vision"}] if ocr_text else None,
-                    check_abort_fn=lambda: abort_flags.get(chat_id)
-                )
+                async with img_semaphore:
+                    # SOTA: Pass precomputed OCR to skip redundant VLM hit
+                    await app_state.multimodal_manager.process_file(
+                        conversation_id=chat_id,
+                        file_path=img_path,
+                        file_type=img_name.split('.')[-1],
+                        file_name=img_name,
+                        precomputed_items=[{"content": ocr_text, "sub_type": "vision"}] if ocr_text else None,
+                        check_abort_fn=lambda: abort_flags.get(chat_id)
+                    )
+
+            # return_exceptions: one bad image must not fail the upload while its
+            # siblings keep writing rows in the background
+            results = await asyncio.gather(
+                *(_process_extracted_image(info) for info in image_metadata),
+                return_exceptions=True
+            )
+            failed_images = 0
+            for info, result in zip(image_metadata, results):
+                if isinstance(result, BaseException):
+                    failed_images += 1
+                    logger.error(f"Extracted image processing failed for {os.path.basename(info['path'])}: {result}")
+            failed_note = f" ({failed_images} failed)" if failed_images else ""
             
             return {
                 "success": True, 
-                "message": f"Successfully processed {filename}. Extracted {len(image_metadata)} images.",
+                "message": f"Successfully processed {filename}. Extracted {len(image_metadata)} images{failed_note}.",
                 "conversation_id": chat_id
             }
         else:
@@ -1583,7 +1614,7 @@ async def view_workspace_file(conversation_id: str, file_name: str, download: bo
     """Serve an uploaded file for viewing in the browser, or as a download."""
     import mimetypes
     file_path = get_file_path(conversation_id, file_name)
-    if not file_path or not file_path.exists():
+    if not file_path:
         raise HTTPException(status_code=404, detail="File not found")
     
     mime_type, _ = mimetypes.guess_type(str(file_path))
@@ -2031,7 +2062,7 @@ async def get_workspace_file(conversation_id: str, file_name: str):
     try:
         file_path = get_file_path(conversation_id, file_name)
         
-        if not file_path or not file_path.exists():
+        if not file_path:
             raise HTTPException(status_code=404, detail=f"File '{file_name}' not found")
         
         # Determine media type based on extension
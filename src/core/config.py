@@ -36,7 +36,7 @@ Quick reference for a high-end GPU machine (e.g. RTX 4090 / A100):
 
 import os
 from pathlib import Path
-from typing import Optional, Any
+from typing import Optional, Any, Union
 from dotenv import load_dotenv
 
 # Load environment variables from Credentials folder
@@ -75,6 +75,12 @@ class OllamaConfig:
     TEMPERATURE: float = float(os.getenv("LLM_TEMPERATURE", "0.0"))
     TIMEOUT: int = int(os.getenv("LLM_TIMEOUT", "600"))
 
+    # Model residency: how long Ollama keeps the model loaded between requests.
+    # Accepts a duration ("30m") or seconds as an integer; -1 pins it in memory.
+    # Avoids the multi-second reload whenever requests are spaced apart.
+    _KEEP_ALIVE_RAW: str = os.getenv("LLM_KEEP_ALIVE", "30m").strip()
+    KEEP_ALIVE: Union[str, int] = int(_KEEP_ALIVE_RAW) if _KEEP_ALIVE_RAW.lstrip("-").isdigit() else _KEEP_ALIVE_RAW
+
 
 class OllamaMultiModelConfig:
     """
@@ -228,9 +234,12 @@ class ContinuousLearningConfig:
       GUIDELINES_TOKEN_BUDGET       — hard max tokens for guideline injection (default: 150)
       EMBEDDING_MODEL_NAME          — HuggingFace model for dedup embeddings (default: all-MiniLM-L6-v2)
       EMBEDDING_SIMILARITY_THRESHOLD — cosine sim threshold for dedup (default: 0.82)
+      EMBEDDING_BACKEND             — "st_fp32" or "onnx_int8" dedup encoder (default: st_fp32)
       REFLECTION_MIN_QUERY_LEN      — min query chars to trigger reflection (default: 10)
       REFLECTION_MIN_RESPONSE_LEN   — min response chars to trigger reflection (default: 20)
       REFLECTION_MIN_CONFIDENCE     — min LLM confidence in generated rule (default: 0.3)
+      REFLECTION_BATCH_WINDOW_MS    — debounce window that coalesces thumbs-down bursts (default: 500)
+      REFLECTION_HEDGE_DELAY_S      — seconds before a slow rule generation is hedged; 0 = retry only on failure (default: 0)
     """
     # Ollama model — SINGLE source of truth; model_size is derived, never set manually
     PRIMARY_OLLAMA_MODEL: str = os.getenv("PRIMARY_OLLAMA_MODEL",
@@ -251,6 +260,10 @@ class ContinuousLearningConfig:
     # HuggingFace embedding model: CPU-only, runs in venv, NOT via Ollama
     EMBEDDING_MODEL_NAME: str = os.getenv("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
 
+    # Dedup embedding backend: "st_fp32" (SentenceTransformer) or "onnx_int8"
+    # (ONNX Runtime, dynamic INT8 — needs optimum[onnxruntime]; falls back to st_fp32)
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "st_fp32").lower()
+
     # Cosine similarity threshold for near-duplicate rule detection
     # 0.82 = very similar; lower = more aggressive dedup
     EMBEDDING_SIMILARITY_THRESHOLD: float = float(
@@ -261,6 +274,15 @@ class ContinuousLearningConfig:
     REFLECTION_MIN_RESPONSE_LEN: int = int(os.getenv("REFLECTION_MIN_RESPONSE_LEN", "20"))
     REFLECTION_MIN_CONFIDENCE: float = float(os.getenv("REFLECTION_MIN_CONFIDENCE", "0.3"))
 
+    # Feedback arriving within this window is reflected in one read-modify-write
+    REFLECTION_BATCH_WINDOW_MS: int = int(os.getenv("REFLECTION_BATCH_WINDOW_MS", "500"))
+
+    # Hedge a still-running reflection generation after this many seconds.
+    # 0 disables timed hedging (attempt 2 starts only if attempt 1 fails): with
+    # OLLAMA_NUM_PARALLEL=1 a hedge just queues behind attempt 1 on the same GPU.
+    # Only set this above the observed p95 generation latency on multi-slot servers.
+    REFLECTION_HEDGE_DELAY_S: float = float(os.getenv("REFLECTION_HEDGE_DELAY_S", "0"))
+
 
 
 # SynthesisConfig has been intentionally REMOVED.
@@ -21,7 +21,7 @@ import lancedb
 import pyarrow as pa
 from pathlib import Path
 from typing import List, Optional, Dict, Any
-from datetime import datetime
+from datetime import datetime, timedelta
 import uuid
 import json
 import numpy as np
@@ -29,6 +29,9 @@ from .config import Config
 from .utils import logger
 import threading
 
+# Upper bound for batched scraped_content scans (a chat's assets, or one file's dedup keys)
+_SCRAPED_SCAN_LIMIT = 100_000
+
 # SOTA: Centralized Schema Registry to prevent Null-type inference corruption
 SCHEMA_REGISTRY = {
     "projects": pa.schema([
@@ -187,6 +190,57 @@ SCHEMA_REGISTRY = {
     ])
 }
 
+
+class _CachedLanceConnection:
+    """
+    Thin proxy over a LanceDB connection that memoizes open_table handles.
+    open_table re-reads the manifest and decodes the schema on every call; hot RAG
+    tables are opened dozens of times per request, so handles are reused by name and
+    invalidated on drop_table / create_table. Everything else delegates to the wrapped connection.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._tables: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def open_table(self, name: str, *args, **kwargs):
+        table = self._tables.get(name)
+        if table is None:
+            table = self._conn.open_table(name, *args, **kwargs)
+            with self._lock:
+                self._tables[name] = table
+        return table
+
+    def create_table(self, name: str, *args, **kwargs):
+        table = self._conn.create_table(name, *args, **kwargs)
+        with self._lock:
+            self._tables[name] = table
+        return table
+
+    def drop_table(self, name: str, *args, **kwargs):
+        with self._lock:
+            self._tables.pop(name, None)
+        return self._conn.drop_table(name, *args, **kwargs)
+
+    def __getattr__(self, attr):
+        return getattr(self._conn, attr)
+
+
+def _connect_lancedb(uri: str):
+    """
+    Open LanceDB with handle caching. Cached handles must still observe writes made
+    through other SpandaOSDatabase instances, so a zero read-consistency interval is
+    requested (cheap version check per read instead of a full re-open). Older lancedb
+    builds without that option fall back to the plain, uncached connection.
+    """
+    try:
+        return _CachedLanceConnection(lancedb.connect(uri, read_consistency_interval=timedelta(0)))
+    except TypeError:
+        logger.debug("LanceDB: read_consistency_interval unsupported; table handle cache disabled.")
+        return lancedb.connect(uri)
+
+
 class SpandaOSDatabase:
     """
     SOTA Database Layer for SpandaOS using LanceDB.
@@ -201,7 +255,7 @@ class SpandaOSDatabase:
     def __init__(self, db_path: Optional[Path] = None):
         self.db_path = db_path or Config.paths.SpandaOS_DB_DIR
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self.conn = lancedb.connect(str(self.db_path))
+        self.conn = _connect_lancedb(str(self.db_path))
         self._initialize_tables()
         self._perform_migrations()
 
@@ -217,49 +271,86 @@ class SpandaOSDatabase:
         self._initialize_tables()
         logger.info("LanceDB reset complete.")
 
+    def _inspect_table_schema(self, table_name: str, target_schema: pa.Schema):
+        """
+        Compare one on-disk table schema against SCHEMA_REGISTRY.
+        Returns (table, needs_recreate, fields_to_fix). Read-only: only the Arrow
+        schema from the table manifest is touched, so probes can run concurrently.
+        """
+        table = self.conn.open_table(table_name)
+        current_schema = table.schema
+        # Schema.names builds a fresh list on every access — snapshot it once as a set
+        current_names = set(current_schema.names)
+
+        fields_to_fix = []
+        for field in target_schema:
+            if field.name not in current_names:
+                fields_to_fix.append(field)
+            else:
+                existing_type = current_schema.field(field.name).type
+                # Critical Fix: Any column typed as 'null' is corrupted and must be repaired
+                if pa.types.is_null(existing_type):
+                    logger.warning(f"⚠️ Corrupted 'null' type detected in {table_name}.{field.name}. Forcing migration.")
+                    fields_to_fix.append(field)
+                # ─── SOTA: Vector Dimension Mismatch Recovery ─────────────────
+                # pa.types.is_fixed_size_list is THE correct PyArrow API for fixed-
+                # size vector columns (pa.list_(pa.float32(), N)).
+                # hasattr(type, 'list_size') is fragile — avoid it.
+                elif pa.types.is_fixed_size_list(existing_type) and pa.types.is_fixed_size_list(field.type):
+                    existing_dim = existing_type.list_size
+                    target_dim = field.type.list_size
+                    if existing_dim != target_dim:
+                        logger.error(
+                            f"🚨 EMBEDDING DIMENSION MISMATCH in '{table_name}.{field.name}': "
+                            f"On-disk={existing_dim}D, Target={target_dim}D (from EMBEDDING_DIMENSION env). "
+                            f"Auto-dropping and recreating with correct schema."
+                        )
+                        return table, True, []
+        return table, False, fields_to_fix
+
     def _perform_migrations(self):
         """SOTA Auto-Migration: Detect and add missing columns to existing tables."""
-        for table_name, target_schema in SCHEMA_REGISTRY.items():
-            if table_name not in self.conn.table_names():
-                continue
-                
-            table = self.conn.open_table(table_name)
-            current_schema = table.schema
-            
-            recreated = False
-            fields_to_fix = []
-            for field in target_schema:
-                if field.name not in current_schema.names:
-                    fields_to_fix.append(field)
-                else:
-                    existing_type = current_schema.field(field.name).type
-                    # Critical Fix: Any column typed as 'null' is corrupted and must be repaired
-                    if pa.types.is_null(existing_type):
-                        logger.warning(f"⚠️ Corrupted 'null' type detected in {table_name}.{field.name}. Forcing migration.")
-                        fields_to_fix.append(field)
-                    # ─── SOTA: Vector Dimension Mismatch Recovery ─────────────────
-                    # pa.types.is_fixed_size_list is THE correct PyArrow API for fixed-
-                    # size vector columns (pa.list_(pa.float32(), N)).
-                    # hasattr(type, 'list_size') is fragile — avoid it.
-                    elif pa.types.is_fixed_size_list(existing_type) and pa.types.is_fixed_size_list(field.type):
-                        existing_dim = existing_type.list_size
-                        target_dim = field.type.list_size
-                        if existing_dim != target_dim:
-                            logger.error(
-                                f"🚨 EMBEDDING DIMENSION MISMATCH in '{table_name}.{field.name}': "
-                                f"On-disk={existing_dim}D, Target={target_dim}D (from EMBEDDING_DIMENSION env). "
-                                f"Auto-dropping and recreating with correct schema."
-                            )
-                            self.conn.drop_table(table_name)
-                            self.conn.create_table(table_name, schema=target_schema)
-                            logger.info(f"✅ '{table_name}' recreated with {target_dim}D vector schema.")
-                            recreated = True
-                            break
+        # List tables once instead of re-listing the DB directory per registry entry
+        existing_tables = set(self.conn.table_names())
+        targets = [(name, schema) for name, schema in SCHEMA_REGISTRY.items() if name in existing_tables]
+
+        # Phase 1: Probe every schema concurrently (independent, read-only, I/O bound)
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(8, max(1, len(targets)))) as pool:
+            probes = list(pool.map(lambda t: self._inspect_table_schema(*t), targets))
+
+        # Short-circuit: the common startup case is a fully up-to-date store
+        pending = [
+            (target, probe) for target, probe in zip(targets, probes)
+            if probe[1] or probe[2]
+        ]
+        if not pending:
+            logger.debug("LanceDB schemas match SCHEMA_REGISTRY — no migrations needed.")
+            return
 
-            if recreated:
-                continue
+        # Phase 2a: Dimension-mismatch recreations — each table is recreated right after
+        # its drop, so a failure leaves at most that one table missing
+        to_recreate = [(name, schema) for (name, schema), probe in pending if probe[1]]
+        rebuilt, failed = [], []
+        for table_name, target_schema in to_recreate:
+            try:
+                self.conn.drop_table(table_name)
+                self.conn.create_table(table_name, schema=target_schema)
+                rebuilt.append(table_name)
+            except Exception as e:
+                failed.append(table_name)
+                logger.error(f"❌ Failed to recreate table '{table_name}' with correct vector schema: {e}")
+        if rebuilt:
+            logger.info(f"✅ Recreated {rebuilt} with correct vector schema.")
+        if failed:
+            logger.error(
+                f"❌ Vector schema migration incomplete: {failed} NOT recreated "
+                f"(may be missing until next startup); recreated: {rebuilt or 'none'}."
+            )
 
-            if not fields_to_fix:
+        # Phase 2b: Apply column repairs sequentially — writes stay ordered and single-threaded
+        for (table_name, target_schema), (table, recreated, fields_to_fix) in pending:
+            if recreated:
                 continue
                 
             logger.info(f"⚡ Migrating table '{table_name}': Fixing/Adding {[f.name for f in fields_to_fix]}")
@@ -676,7 +767,8 @@ class SpandaOSDatabase:
         """Fetch the total count of messages in a conversation."""
         try:
             table = self.conn.open_table("messages")
-            return len(table.search().where(f"conversation_id = '{conversation_id}'").to_list())
+            # count_rows pushes the filter into Lance — no row materialization
+            return table.count_rows(filter=f"conversation_id = '{conversation_id}'")
         except Exception as e:
             logger.error(f"Error getting message count: {e}")
             return 0
@@ -1127,6 +1219,60 @@ class SpandaOSDatabase:
         }])
         return content_id
 
+    def add_scraped_contents(self, file_id: str, items: List[Dict]) -> List[str]:
+        """
+        Batch variant of add_scraped_content for one file: a single dedup read and a
+        single LanceDB append (one fragment/commit) instead of one round-trip per item.
+        Each item: {content, sub_type?, chunk_index?, page_number?, timestamp?, metadata?}.
+        """
+        if not items:
+            return []
+        table = self.conn.open_table("scraped_content")
+        
+        # SOTA Deduplication Guard: one scan of this file's rows, matched in memory
+        existing_by_key: Dict[tuple, List[Dict]] = {}
+        try:
+            # Explicit cap: LanceDB's default limit of 10 would hide existing rows
+            for row in table.search().where(f"file_id = '{file_id}'").limit(_SCRAPED_SCAN_LIMIT).to_list():
+                existing_by_key.setdefault((row.get('sub_type'), row.get('chunk_index')), []).append(row)
+        except Exception as e:
+            logger.warning(f"Scraped deduplication check failed (non-fatal): {e}")
+        
+        ids, new_rows = [], []
+        now = datetime.utcnow().isoformat()
+        for idx, item in enumerate(items):
+            sub_type = item.get('sub_type', 'text')
+            chunk_index = item.get('chunk_index', idx)
+            timestamp = item.get('timestamp')
+            match = next(
+                (r for r in existing_by_key.get((sub_type, chunk_index), [])
+                 if not timestamp or r.get('timestamp') == timestamp),
+                None
+            )
+            if match:
+                logger.debug(f"Scraped content already exists for file {file_id} (type: {sub_type}). Skipping.")
+                ids.append(match['id'])
+                continue
+            
+            content_id = str(uuid.uuid4())
+            page_number = item.get('page_number')
+            new_rows.append({
+                "id": content_id,
+                "file_id": file_id,
+                "content": item['content'],
+                "sub_type": sub_type,
+                "chunk_index": chunk_index,
+                "page_number": page_number if page_number is not None else 0,
+                "timestamp": timestamp or "",
+                "metadata": json.dumps(item.get('metadata') or {}, ensure_ascii=False),
+                "created_at": now
+            })
+            ids.append(content_id)
+        
+        if new_rows:
+            table.add(new_rows)
+        return ids
+
     def get_scraped_content(self, file_id: str) -> List[Dict]:
         """Fetch all perception items for a specific file."""
         table = self.conn.open_table("scraped_content")
@@ -1147,25 +1293,77 @@ class SpandaOSDatabase:
         """
         # 1. Get all assets for this chat to build a name map
         assets = self.get_assets(conversation_id)
-        asset_map = {a['id']: a for a in assets}
-        
+        return self._scraped_content_for_assets({a['id']: a for a in assets})
+
+    def _scraped_content_for_assets(self, asset_map: Dict[str, Dict]) -> List[Dict]:
+        """
+        Collect scraped items for a set of assets in ONE filtered scan (file_id IN ...)
+        instead of one query per asset, then attach file_name / file_type attribution.
+        """
         if not asset_map:
             return []
             
         # 2. Collect all scraped items referencing those assets
-        scraped_table = self.conn.open_table("scraped_content")
-        all_content = []
+        table = self.conn.open_table("scraped_content")
+        id_list = ", ".join(f"'{aid}'" for aid in asset_map)
+        # One filtered scan; the explicit cap replaces LanceDB's default limit of 10 rows
+        items = table.search().where(f"file_id IN ({id_list})").limit(_SCRAPED_SCAN_LIMIT).to_list()
         
-        for aid, asset in asset_map.items():
-            items = self.get_scraped_content(aid)
+        all_content = []
+        for item in items:
+            it_meta = item.get('metadata', '{}')
+            if not it_meta or it_meta == '{}':
+                item['metadata'] = {}  # Most perception rows carry no metadata — skip the parser
+            else:
+                try:
+                    item['metadata'] = json.loads(it_meta) if isinstance(it_meta, str) else it_meta
+                except:
+                    item['metadata'] = {}
+            # Resolved evidence type, COALESCE(metadata.type, sub_type, 'text'), computed once here
+            item['meta_type'] = item['metadata'].get('type') or item.get('sub_type') or 'text'
             # Inject file name and other metadata for precise RAG attribution
-            for item in items:
-                item['file_name'] = asset.get('file_name', 'Unknown')
-                item['file_type'] = asset.get('file_type', 'file')
-                all_content.append(item)
+            asset = asset_map.get(item.get('file_id'), {})
+            item['file_name'] = asset.get('file_name', 'Unknown')
+            item['file_type'] = asset.get('file_type', 'file')
+            all_content.append(item)
             
         return all_content
 
+    def get_evidence_version(self) -> Optional[tuple]:
+        """
+        Write stamp for fusion caches: current versions of the evidence tables.
+        Every LanceDB add/update/delete commits a new table version, so an unchanged
+        stamp means no evidence was written since. None if a table can't be read.
+        """
+        try:
+            return tuple(
+                self.conn.open_table(name).version
+                for name in ("enriched_content", "scraped_content", "conversation_assets")
+            )
+        except Exception as e:
+            logger.debug(f"Evidence version probe failed: {e}")
+            return None
+
+    def get_fused_evidence_by_chat(self, conversation_id: str, include_enriched: bool = True) -> Dict[str, List[Dict]]:
+        """
+        Single-call evidence bundle for UniversalFusionExtractor.
+        LanceDB has no JOIN, so this is the nearest equivalent: one read of
+        conversation_assets shared by the registry and scraped lookups, plus one
+        filtered scan each for enriched_content and scraped_content.
+        Returns {"enriched": [...], "scraped": [...], "assets": [...]}
+        ("enriched" is empty when include_enriched=False, for callers that already hold it).
+        """
+        try:
+            assets = self.get_assets(conversation_id)
+        except Exception as e:
+            logger.error(f"Error getting documents by chat: {e}")
+            assets = []
+        return {
+            "enriched": self.get_enriched_content_by_chat(conversation_id) if include_enriched else [],
+            "scraped": self._scraped_content_for_assets({a['id']: a for a in assets}),
+            "assets": assets
+        }
+
     # --- Enriched Content (Unified Source of Truth) ---
 
     def add_enriched_content(self, file_id: str, conversation_id: str, 
@@ -1450,43 +1648,34 @@ class SpandaOSDatabase:
 
     def delete_conversation(self, conversation_id: str) -> bool:
         """Delete a conversation and its messages."""
+        from concurrent.futures import ThreadPoolExecutor
+        where = f"conversation_id = '{conversation_id}'"
+        # Each table is its own LanceDB dataset (no cross-table transaction), so the child
+        # purges commit concurrently instead of paying one version commit after another.
+        # The conversation record itself goes last, only once its required children are gone.
+        required = ("messages", "conversation_assets")
+        # SOTA: Wipe enriched content, Map-Reduce Summaries, Web Knowledge Cache and the
+        # Knowledge Base (Phase 26 leak) alongside the chat
+        optional = ("enriched_content", "document_summaries", "web_search_knowledge", "knowledge_base")
+        
+        def _purge(table_name: str):
+            self.conn.open_table(table_name).delete(where=where)
+        
         try:
-            # 1. Delete messages
-            msg_table = self.conn.open_table("messages")
-            msg_table.delete(where=f"conversation_id = '{conversation_id}'")
+            with ThreadPoolExecutor(max_workers=len(required) + len(optional)) as pool:
+                futures = {name: pool.submit(_purge, name) for name in required + optional}
             
-            # 2. Delete assets
-            asset_table = self.conn.open_table("conversation_assets")
-            asset_table.delete(where=f"conversation_id = '{conversation_id}'")
+            for name in optional:
+                err = futures[name].exception()
+                if err is not None:
+                    logger.debug(f"{name} purge skipped/failed: {err}")
+                elif name == "knowledge_base":
+                    logger.info(f"Purged knowledge_base chunks for conversion: {conversation_id}")
+            for name in required:
+                futures[name].result()
             
-            # 3. Delete conversation record
             conv_table = self.conn.open_table("conversations")
             conv_table.delete(where=f"id = '{conversation_id}'")
-            
-            # 4. Optional: Delete enriched content
-            try:
-                enriched_table = self.conn.open_table("enriched_content")
-                enriched_table.delete(where=f"conversation_id = '{conversation_id}'")
-            except: pass
-
-            # 5. SOTA: Wipe Map-Reduce Summaries & Web Knowledge Cache to prevent storage leak
-            try:
-                sum_table = self.conn.open_table("document_summaries")
-                sum_table.delete(where=f"conversation_id = '{conversation_id}'")
-            except: pass
-
-            try:
-                web_table = self.conn.open_table("web_search_knowledge")
-                web_table.delete(where=f"conversation_id = '{conversation_id}'")
-            except: pass
-
-            # 6. SOTA Phase 26: Purge Knowledge Base (the missing leak)
-            try:
-                kb_table = self.conn.open_table("knowledge_base")
-                kb_table.delete(where=f"conversation_id = '{conversation_id}'")
-                logger.info(f"Purged knowledge_base chunks for conversion: {conversation_id}")
-            except Exception as e:
-                logger.debug(f"Knowledge purge skipped/failed: {e}")
             return True
         except Exception as e:
             logger.error(f"Error deleting conversation: {e}")
@@ -26,14 +26,31 @@ with the primary LLM for VRAM.
 
 Responsibilities:
   - Load all-MiniLM-L6-v2 once at startup (~90MB, 384-dim output)
-  - Expose encode() and cosine_similarity() for the learning loop
+  - Optional ONNX Runtime INT8 backend (EMBEDDING_BACKEND=onnx_int8)
+  - Expose encode() / encode_batch() for the learning loop (dedup scoring is a
+    batched int8 matrix product in ReflectionAgent, not pairwise calls)
+  - encode_async(): coalesces concurrent callers into one batched forward pass
   - Degrade gracefully to a keyword-overlap fallback if unavailable
-  - Cache warm: run one encode() on init to force weight loading into RAM
+  - Cache warm: one background encode() after init faults weights into RAM
 
 Registered as app_state.embedding_manager in main.py lifespan.
 """
 
+import re
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
 from ..core.utils import logger
+from ..core.config import Config, PathConfig
+
+
+# Parameter-count tag in an Ollama name: "4b", "0.5b", "1.5b", "e2b", "_4b", "70b"
+_PARAM_COUNT_RE = re.compile(r"(?<![\d.])(\d+(?:\.\d+)?)b\b")
+_SMALL_TIER_MAX_B = 5.0
 
 
 def detect_model_size(model_name: str) -> str:
@@ -48,18 +65,67 @@ def detect_model_size(model_name: str) -> str:
       detect_model_size("gemma3:4b")    → "4B"
       detect_model_size("qwen3:8b")     → "8B"
       detect_model_size("llama3:70b")   → "8B"  (safe default)
+      detect_model_size("qwen3:14b")    → "8B"
+    """
+    match = _PARAM_COUNT_RE.search(model_name.lower())
+    if match is None:
+        return "8B"  # safe default: conservative limits
+    return "4B" if float(match.group(1)) <= _SMALL_TIER_MAX_B else "8B"
+
+
+class _OnnxInt8Encoder:
+    """
+    all-MiniLM-L6-v2 on ONNX Runtime with dynamic INT8 quantization.
+    Mirrors the SentenceTransformer.encode() subset EmbeddingManager uses:
+    tokenize → ONNX forward → attention-masked mean pool → L2 normalize.
+
+    First run exports + quantizes once into PathConfig.CACHE_DIR; later runs
+    load the cached model_quantized.onnx directly.
     """
-    lower = model_name.lower()
-    small_markers = ["4b", "3b", "2b", "1b", "0.5b", "0.5", "_4b", "_3b", "_2b"]
-    large_markers = ["8b", "7b", "6b", "9b", "_8b", "_7b", "_6b"]
 
-    for m in small_markers:
-        if m in lower:
-            return "4B"
-    for m in large_markers:
-        if m in lower:
-            return "8B"
-    return "8B"  # safe default: conservative limits
+    _HF_ID = "sentence-transformers/all-MiniLM-L6-v2"
+    _MAX_SEQ_LEN = 256  # all-MiniLM-L6-v2 max_seq_length
+
+    def __init__(self, cache_dir: Path):
+        # Optional deps: ImportError here makes EmbeddingManager fall back to st_fp32
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer  # type: ignore
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig  # type: ignore
+        from transformers import AutoTokenizer  # type: ignore
+
+        quant_dir = cache_dir / "int8"
+        if not (quant_dir / "model_quantized.onnx").exists():
+            logger.info("EmbeddingManager: Exporting + INT8-quantizing MiniLM to ONNX (one-time)...")
+            fp32_model = ORTModelForFeatureExtraction.from_pretrained(self._HF_ID, export=True)
+            fp32_model.save_pretrained(cache_dir / "fp32")
+            quantizer = ORTQuantizer.from_pretrained(fp32_model)
+            qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+            quantizer.quantize(save_dir=quant_dir, quantization_config=qconfig)
+            AutoTokenizer.from_pretrained(self._HF_ID).save_pretrained(quant_dir)
+
+        self._tokenizer = AutoTokenizer.from_pretrained(quant_dir)
+        self._model = ORTModelForFeatureExtraction.from_pretrained(
+            quant_dir, file_name="model_quantized.onnx"
+        )
+
+    def encode(self, texts, batch_size: int = 32, show_progress_bar: bool = False,
+               normalize_embeddings: bool = True, convert_to_numpy: bool = True) -> np.ndarray:
+        if isinstance(texts, str):
+            texts = [texts]
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            enc = self._tokenizer(
+                texts[start:start + batch_size], padding=True, truncation=True,
+                max_length=self._MAX_SEQ_LEN, return_tensors="np"
+            )
+            hidden = np.asarray(self._model(**enc).last_hidden_state, dtype=np.float32)
+            mask = enc["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if normalize_embeddings:
+                pooled /= np.linalg.norm(pooled, axis=1, keepdims=True) + 1e-12
+            batches.append(pooled)
+        if not batches:
+            return np.empty((0, 384), dtype=np.float32)
+        return np.concatenate(batches).astype(np.float32, copy=False)
 
 
 class EmbeddingManager:
@@ -72,14 +138,24 @@ class EmbeddingManager:
     Usage:
         emb = EmbeddingManager()
         success = emb.initialize()      # call once at startup
-        vec = emb.encode("some text")   # returns list[float] or None
-        sim = emb.cosine_similarity(a, b)  # float in [-1.0, 1.0]
+        vec = emb.encode("some text")   # returns float32 np.ndarray (unit length) or None
+        vec = await emb.encode_async("some text")  # same, micro-batched off the event loop
     """
 
+    # Micro-batching window for encode_async() and the early-flush batch size
+    _ENCODE_WINDOW_S = 0.05
+    _ENCODE_MAX_BATCH = 32
+
     def __init__(self):
         self._model = None
         self._model_ready = False
         self._load_error: Exception | None = None
+        # encode_async() queue: (text, future) pairs drained by a single batch task
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._batch_task: asyncio.Task | None = None
+        self._batch_full = asyncio.Event()
+        # Dedicated single worker — one batched BLAS call at a time, threads unfragmented
+        self._pool: ThreadPoolExecutor | None = None
 
     def initialize(self) -> bool:
         """
@@ -91,14 +167,30 @@ class EmbeddingManager:
             logger.info("  → First run: model download may take 30-90 seconds (~90MB)")
             logger.info("  → Subsequent runs: loads from local HuggingFace cache instantly")
 
-            from sentence_transformers import SentenceTransformer  # type: ignore
+            self._model = None
+            if Config.learning.EMBEDDING_BACKEND == "onnx_int8":
+                try:
+                    self._model = _OnnxInt8Encoder(PathConfig.CACHE_DIR / "minilm_onnx")
+                    logger.info("EmbeddingManager: ONNX Runtime INT8 backend loaded.")
+                except Exception as e:
+                    logger.warning(
+                        f"EmbeddingManager: onnx_int8 backend unavailable ({e}) — "
+                        f"falling back to SentenceTransformer fp32."
+                    )
+                    self._model = None
 
-            # device='cpu' is MANDATORY — must never compete with primary LLM for VRAM
-            self._model = SentenceTransformer("all-MiniLM-L6-v2", device="cpu")
+            if self._model is None:
+                from sentence_transformers import SentenceTransformer  # type: ignore
+
+                # device='cpu' is MANDATORY — must never compete with primary LLM for VRAM
+                self._model = SentenceTransformer("all-MiniLM-L6-v2", device="cpu")
             self._model_ready = True
 
-            # Warm up: encode one sentence to force weight loading into CPU memory
-            _ = self._model.encode(["warmup"], show_progress_bar=False)
+            # Warm up off the startup path: weights are already loaded once the
+            # constructor returns, the first forward pass only faults pages in
+            threading.Thread(
+                target=self._warmup, name="embedding-warmup", daemon=True
+            ).start()
 
             logger.info("EmbeddingManager: ✅ Ready. 384-dim embeddings on CPU.")
             return True
@@ -110,9 +202,16 @@ class EmbeddingManager:
             logger.warning("EmbeddingManager: Falling back to keyword-overlap deduplication.")
             return False
 
-    def encode(self, text: str) -> list | None:
+    def _warmup(self) -> None:
+        """Encode one sentence to force weight pages into CPU memory. Never raises."""
+        try:
+            self._model.encode(["warmup"], show_progress_bar=False)
+        except Exception as e:
+            logger.warning(f"EmbeddingManager: Background warmup failed: {e}")
+
+    def encode(self, text: str) -> np.ndarray | None:
         """
-        Returns a 384-dim embedding as list[float], or None if unavailable.
+        Returns a 384-dim float32 embedding as np.ndarray, or None if unavailable.
         Never raises — callers must handle None return.
         normalize_embeddings=True means vectors have unit length,
         so cosine similarity reduces to a simple dot product.
@@ -125,28 +224,74 @@ class EmbeddingManager:
                 show_progress_bar=False,
                 normalize_embeddings=True
             )
-            return embedding[0].tolist()
+            return np.asarray(embedding[0], dtype=np.float32)
         except Exception as e:
             logger.error(f"EmbeddingManager: encode() failed: {e}")
             return None
 
-    def cosine_similarity(self, vec_a: list, vec_b: list) -> float:
+    def encode_batch(self, texts: list) -> np.ndarray | None:
         """
-        Pure numpy cosine similarity for two pre-normalized vectors.
-        For normalized vectors (normalize_embeddings=True): cosine_sim = dot product.
-        Fast — no model call needed.
-
-        Returns float in [-1.0, 1.0]. Values ≥ 0.82 are considered near-duplicate.
+        Returns an (N, 384) float32 matrix of normalized embeddings from ONE
+        batched model call, or None if unavailable. Never raises.
         """
+        if not self._model_ready or self._model is None:
+            return None
+        if not texts:
+            return np.empty((0, 384), dtype=np.float32)
         try:
-            import numpy as np
-            a = np.array(vec_a, dtype=np.float32)
-            b = np.array(vec_b, dtype=np.float32)
-            dot = float(np.dot(a, b))
-            return max(-1.0, min(1.0, dot))  # clamp for float precision
+            embeddings = self._model.encode(
+                list(texts),
+                batch_size=32,
+                show_progress_bar=False,
+                normalize_embeddings=True,
+                convert_to_numpy=True
+            )
+            return np.asarray(embeddings, dtype=np.float32)
         except Exception as e:
-            logger.error(f"EmbeddingManager: cosine_similarity() failed: {e}")
-            return 0.0
+            logger.error(f"EmbeddingManager: encode_batch() failed: {e}")
+            return None
+
+    async def encode_async(self, text: str) -> np.ndarray | None:
+        """
+        Async encode() for event-loop callers. Concurrent calls arriving within
+        a ~50 ms window (or until 32 accumulate) share ONE encode_batch() run on
+        the dedicated embedding thread. Same return contract as encode().
+        """
+        if not self._model_ready or self._model is None:
+            return None
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((text, fut))
+        if self._batch_task is None or self._batch_task.done():
+            self._batch_full.clear()
+            self._batch_task = loop.create_task(self._drain_encode_queue())
+        elif len(self._pending) >= self._ENCODE_MAX_BATCH:
+            self._batch_full.set()
+        return await fut
+
+    async def _drain_encode_queue(self) -> None:
+        """Waits out the batching window, then encodes everything queued in max-size batches."""
+        try:
+            await asyncio.wait_for(self._batch_full.wait(), timeout=self._ENCODE_WINDOW_S)
+        except asyncio.TimeoutError:
+            pass
+
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding")
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            batch = self._pending[:self._ENCODE_MAX_BATCH]
+            del self._pending[:self._ENCODE_MAX_BATCH]
+            try:
+                vectors = await loop.run_in_executor(
+                    self._pool, self.encode_batch, [text for text, _ in batch]
+                )
+            except Exception as e:
+                logger.error(f"EmbeddingManager: encode_async() batch failed: {e}")
+                vectors = None
+            for i, (_, fut) in enumerate(batch):
+                if not fut.done():  # caller may have been cancelled
+                    fut.set_result(vectors[i] if vectors is not None else None)
 
     @property
     def is_ready(self) -> bool:
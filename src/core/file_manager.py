@@ -33,29 +33,36 @@ from .utils import logger
 DATA_DIR = Path(__file__).parent.parent.parent / "data"
 UPLOADS_DIR = DATA_DIR / "uploads"
 
+SUBFOLDERS = ["documents", "images", "audio", "video"]
+
+# Map raw extension or type to subfolder
+_TYPE_TO_SUBFOLDER = {
+    'pdf': 'documents', 'txt': 'documents', 'word': 'documents', 'docx': 'documents',
+    'csv': 'documents', 'xls': 'documents', 'xlsx': 'documents',
+    'png': 'images', 'jpg': 'images', 'jpeg': 'images', 'image': 'images',
+    'mp3': 'audio', 'wav': 'audio', 'audio': 'audio',
+    'mp4': 'video', 'mov': 'video', 'webm': 'video', 'video': 'video'
+}
+
+# Conversations whose upload tree is already on disk (skips 4 mkdir syscalls per upload).
+# Invalidated by delete_chat_dir / nuke_uploads.
+_ensured_chat_dirs = set()
+
 def ensure_chat_dir(conversation_id: str) -> Path:
     """Ensure directory for a specific conversation exists."""
     chat_path = UPLOADS_DIR / conversation_id
-    subfolders = ["documents", "images", "audio", "video"]
+    if conversation_id in _ensured_chat_dirs and chat_path.is_dir():
+        return chat_path
     
-    for sub in subfolders:
+    for sub in SUBFOLDERS:
         (chat_path / sub).mkdir(parents=True, exist_ok=True)
         
+    _ensured_chat_dirs.add(conversation_id)
     return chat_path
 
 def get_upload_path(conversation_id: str, file_type: str, file_name: str) -> Path:
     """Get the target path for an uploaded file."""
-    # Map raw extension or type to subfolder
-    subfolder = "documents"
-    type_map = {
-        'pdf': 'documents', 'txt': 'documents', 'word': 'documents', 'docx': 'documents',
-        'csv': 'documents', 'xls': 'documents', 'xlsx': 'documents',
-        'png': 'images', 'jpg': 'images', 'jpeg': 'images', 'image': 'images',
-        'mp3': 'audio', 'wav': 'audio', 'audio': 'audio',
-        'mp4': 'video', 'mov': 'video', 'webm': 'video', 'video': 'video'
-    }
-    
-    subfolder = type_map.get(file_type.lower(), "documents")
+    subfolder = _TYPE_TO_SUBFOLDER.get(file_type.lower(), "documents")
     ensure_chat_dir(conversation_id)
     return UPLOADS_DIR / conversation_id / subfolder / file_name
 
@@ -87,34 +94,33 @@ def list_uploads(conversation_id: str) -> list:
     chat_path = UPLOADS_DIR / conversation_id
     files = []
     
-    if not chat_path.exists():
-        return files
-    
-    for subfolder in ["documents", "images", "audio", "video"]:
-        folder_path = chat_path / subfolder
-        if folder_path.exists():
-            for file_path in folder_path.iterdir():
-                if file_path.is_file():
-                    files.append({
-                        "name": file_path.name,
-                        "path": str(file_path),
-                        "type": subfolder,
-                        "size": file_path.stat().st_size
-                    })
+    # os.scandir: DirEntry caches is_file()/stat() from the directory read,
+    # so each file costs no extra syscalls beyond its single stat.
+    for subfolder in SUBFOLDERS:
+        try:
+            with os.scandir(chat_path / subfolder) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        files.append({
+                            "name": entry.name,
+                            "path": entry.path,
+                            "type": subfolder,
+                            "size": entry.stat().st_size
+                        })
+        except (FileNotFoundError, NotADirectoryError):
+            continue
     
     return files
 
 
 def get_file_path(conversation_id: str, file_name: str) -> Optional[Path]:
-    """Get the full path for a specific file in a conversation's uploads."""
+    """Get the full path for a specific file in a conversation's uploads.
+    Returns a path that was just verified with is_file() — callers need not re-stat it."""
     chat_path = UPLOADS_DIR / conversation_id
     
-    if not chat_path.exists():
-        return None
-    
-    for subfolder in ["documents", "images", "audio", "video"]:
+    for subfolder in SUBFOLDERS:
         file_path = chat_path / subfolder / file_name
-        if file_path.exists():
+        if file_path.is_file():
             return file_path
     
     return None
@@ -122,6 +128,7 @@ def get_file_path(conversation_id: str, file_name: str) -> Optional[Path]:
 def delete_chat_dir(conversation_id: str) -> bool:
     """Delete all uploads for a specific conversation."""
     chat_path = UPLOADS_DIR / conversation_id
+    _ensured_chat_dirs.discard(conversation_id)
     if chat_path.exists():
         try:
             shutil.rmtree(chat_path)
@@ -134,6 +141,7 @@ def delete_chat_dir(conversation_id: str) -> bool:
 
 def nuke_uploads() -> bool:
     """Wipe the entire uploads directory (Nuclear Option)."""
+    _ensured_chat_dirs.clear()
     if UPLOADS_DIR.exists():
         try:
             for item in UPLOADS_DIR.iterdir():
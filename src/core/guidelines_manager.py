@@ -37,22 +37,143 @@ Also contains: run_schema_migration() — called once at startup.
 
 import os
 import json
+import base64
 import time
 import uuid
 import asyncio
 import threading
 import shutil
+import heapq
+from collections import Counter
 from datetime import datetime, timezone
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
+
+import numpy as np
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 from .utils import logger
 from .embedding_manager import detect_model_size
 
+# Intent types emitted by the Brain's IntentClassifier mapping
+QUERY_TYPES = ("factual", "reasoning", "multilingual", "technical", "creative", "general")
+
+
+# Dedup embeddings are all-MiniLM-L6-v2 vectors
+EMBEDDING_DIM = 384
+
+# Rule embeddings are stored per-vector symmetric int8: v ≈ embedding_q8 * embedding_scale
+EMBEDDING_KEYS = ("embedding", "embedding_q8", "embedding_scale")
+
+# embedding_q8 is the base64 of the 384 raw int8 bytes (one short JSON string per
+# rule, decoded with np.frombuffer). Older files hold it as a list of ints.
+_Q8_B64_LEN = 4 * ((EMBEDDING_DIM + 2) // 3)
+
+
+def quantize_int8(vec) -> Tuple[np.ndarray, float]:
+    """Per-vector symmetric int8 quantization: scale = max|v| / 127."""
+    v = np.asarray(vec, dtype=np.float32)
+    peak = float(np.abs(v).max()) if v.size else 0.0
+    scale = peak / 127.0 if peak > 0.0 else 1.0
+    q = np.clip(np.rint(v / scale), -127, 127).astype(np.int8)
+    return q, scale
+
+
+def compact_rule_embedding(rule: Dict) -> Dict:
+    """
+    In-place migration of a legacy float `embedding` list (or a list-form
+    `embedding_q8`) to the on-disk form: base64 int8 `embedding_q8` +
+    `embedding_scale`. One 512-char string instead of 384 JSON numbers.
+    """
+    emb = rule.get("embedding")
+    q8 = rule.get("embedding_q8")
+    if q8 is None and emb is not None and len(emb) == EMBEDDING_DIM:
+        q, scale = quantize_int8(emb)
+        rule["embedding_q8"] = base64.b64encode(q.tobytes()).decode("ascii")
+        rule["embedding_scale"] = scale
+    elif isinstance(q8, list) and len(q8) == EMBEDDING_DIM:
+        rule["embedding_q8"] = base64.b64encode(np.asarray(q8, dtype=np.int8).tobytes()).decode("ascii")
+    if "embedding_q8" in rule:
+        rule.pop("embedding", None)
+    return rule
+
+
+def rule_embedding_q8(rule: Dict) -> Optional[np.ndarray]:
+    """int8 embedding of a rule (quantizing a legacy float list on the fly), or None."""
+    q8 = rule.get("embedding_q8")
+    if isinstance(q8, str) and len(q8) == _Q8_B64_LEN:
+        return np.frombuffer(base64.b64decode(q8), dtype=np.int8)
+    if isinstance(q8, list) and len(q8) == EMBEDDING_DIM:
+        return np.asarray(q8, dtype=np.int8)
+    emb = rule.get("embedding")
+    if emb is not None and len(emb) == EMBEDDING_DIM:
+        return quantize_int8(emb)[0]
+    return None
+
+
+def has_rule_embedding(rule: Dict) -> bool:
+    """True if the rule carries a usable 384-dim embedding (int8 or legacy float)."""
+    q8 = rule.get("embedding_q8")
+    if isinstance(q8, str):
+        return len(q8) == _Q8_B64_LEN
+    return (len(q8 or ()) == EMBEDDING_DIM
+            or len(rule.get("embedding") or ()) == EMBEDDING_DIM)
+
+
+def build_embedding_matrix(
+    rules: List[Dict]
+) -> Tuple[Optional[np.ndarray], Optional[np.ndarray], List[str]]:
+    """
+    Stacks the embeddings of active rules into ONE contiguous (N, 384) int8
+    matrix, the (N,) float32 inverse row norms, and the parallel list of rule ids.
+    Rows are ordered by last_triggered, newest first.
+    Per-vector scales cancel out of the cosine, so only int8 norms are kept.
+    Returns (None, None, []) when no active rule carries an embedding.
+    """
+    ids: List[str] = []
+    rows: List[np.ndarray] = []
+    # Most recently triggered first: duplicates tend to re-hit hot rules, so the
+    # chunked early-exit dedup scan usually stops in the first chunk.
+    # (UTC ISO-8601 strings from isoformat() order lexicographically.)
+    ordered = sorted(
+        (r for r in rules if r.get("status") == "active"),
+        key=lambda r: r.get("last_triggered") or r.get("created_at") or "",
+        reverse=True
+    )
+    for rule in ordered:
+        q = rule_embedding_q8(rule)
+        if q is not None:
+            ids.append(rule.get("id"))
+            rows.append(q)
+    if not rows:
+        return None, None, []
+    matrix = np.stack(rows)
+    inv_norms = 1.0 / (np.linalg.norm(matrix.astype(np.float32), axis=1) + 1e-12)
+    return matrix, inv_norms.astype(np.float32), ids
+
 
 # =============================================================================
 # SCHEMA MIGRATION (Phase 2)
 # =============================================================================
 
+def _loads_json(raw: bytes) -> Any:
+    """Parse a guidelines document (orjson when available; same JSONDecodeError family)."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _dumps_json(data: Any) -> bytes:
+    """Indent-2 UTF-8 guidelines document (orjson when available, numpy arrays allowed)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
 def run_schema_migration(guidelines_path: str, embedding_manager=None) -> None:
     """
     Atomic, backup-first migration from v1 (flat string list) → v2 (rich objects).
@@ -75,8 +196,8 @@ def run_schema_migration(guidelines_path: str, embedding_manager=None) -> None:
         # STEP 1: Check if already v2
         if os.path.exists(path):
             try:
-                with open(path, "r", encoding="utf-8") as f:
-                    existing = json.load(f)
+                with open(path, "rb") as f:
+                    existing = _loads_json(f.read())
                 if existing.get("schema_version") == "2.0":
                     logger.info("GuidelinesManager: Schema already v2.0 — no migration needed.")
                     return
@@ -121,10 +242,9 @@ def run_schema_migration(guidelines_path: str, embedding_manager=None) -> None:
         old_rules_raw = existing.get("guidelines", existing.get("rules", []))
         migrated_rules = []
 
+        # Pass 1: extract (raw, rule_text, rule_id) for every non-empty rule
+        items = []
         for raw in old_rules_raw:
-            rule_id = str(uuid.uuid4())
-            now_iso = datetime.now(timezone.utc).isoformat()
-
             # Extract rule text regardless of format
             if isinstance(raw, str):
                 rule_text = raw.strip()
@@ -135,21 +255,23 @@ def run_schema_migration(guidelines_path: str, embedding_manager=None) -> None:
 
             if not rule_text:
                 continue
+            items.append((raw, rule_text, str(uuid.uuid4())))
 
-            # Generate embedding if EmbeddingManager is available
-            embedding = []
-            if embedding_manager is not None and hasattr(embedding_manager, "is_ready") and embedding_manager.is_ready:
-                try:
-                    result = embedding_manager.encode(rule_text)
-                    if result is not None:
-                        embedding = result
-                        logger.info(f"GuidelinesManager: Embedding generated for rule {rule_id}")
-                    else:
-                        logger.info(f"GuidelinesManager: Embedding unavailable for rule {rule_id} — using []")
-                except Exception:
-                    logger.info(f"GuidelinesManager: Embedding unavailable for rule {rule_id} — using []")
-            else:
-                logger.info(f"GuidelinesManager: Embedding unavailable for rule {rule_id} — using []")
+        # Pass 2: ONE batched encode for all rule texts (if EmbeddingManager is available)
+        embeddings = None
+        if items and embedding_manager is not None and getattr(embedding_manager, "is_ready", False):
+            try:
+                embeddings = embedding_manager.encode_batch([text for _, text, _ in items])
+            except Exception as e:
+                logger.info(f"GuidelinesManager: Batch embedding failed ({e}) — using []")
+            if embeddings is not None:
+                logger.info(f"GuidelinesManager: Embeddings generated for {len(items)} rules (batched)")
+        if embeddings is None:
+            logger.info(f"GuidelinesManager: Embedding unavailable for {len(items)} rules — using []")
+
+        for i, (raw, rule_text, rule_id) in enumerate(items):
+            now_iso = datetime.now(timezone.utc).isoformat()
+            embedding = embeddings[i] if embeddings is not None else []
 
             migrated_rule = {
                 "id": rule_id,
@@ -166,7 +288,7 @@ def run_schema_migration(guidelines_path: str, embedding_manager=None) -> None:
                 "source_summary": raw.get("source_summary", "Migrated from previous version") if isinstance(raw, dict) else "Migrated from previous version",
                 "model_generated_by": raw.get("model_generated_by", "unknown") if isinstance(raw, dict) else "unknown",
             }
-            migrated_rules.append(migrated_rule)
+            migrated_rules.append(compact_rule_embedding(migrated_rule))
 
         # STEP 5: Build final v2 structure
         new_data = {
@@ -176,13 +298,12 @@ def run_schema_migration(guidelines_path: str, embedding_manager=None) -> None:
         }
 
         # STEP 6: Write to temp
-        json_str = json.dumps(new_data, ensure_ascii=False, indent=2)
-        with open(temp_path, "w", encoding="utf-8") as f:
-            f.write(json_str)
+        with open(temp_path, "wb") as f:
+            f.write(_dumps_json(new_data))
 
         # Validate temp
-        with open(temp_path, "r", encoding="utf-8") as f:
-            test = json.load(f)
+        with open(temp_path, "rb") as f:
+            test = _loads_json(f.read())
         assert test.get("schema_version") == "2.0", "schema_version mismatch"
         assert isinstance(test.get("rules"), list), "'rules' not a list"
         for r in test["rules"]:
@@ -237,7 +358,8 @@ class GuidelinesManager:
     Hardware-aware (4B vs 8B model) rule count and token budget limits.
 
     Thread safety:
-      - asyncio.Lock for coroutine callers (get_relevant_rules, force_reload)
+      - asyncio.Lock for coroutine callers that stat/reload (TTL refresh, force_reload);
+        the warm get_relevant_rules path only reads swapped-in attributes
       - threading.Lock reserved for future sync callers
     """
 
@@ -252,6 +374,12 @@ class GuidelinesManager:
         self._cache_ttl = cache_ttl_seconds
         self._rules: List[Dict] = []
         self._active_rules: List[Dict] = []
+        # ((N, 384) int8 matrix, (N,) inverse norms, parallel rule ids) — swapped atomically on load
+        self._emb_index: Tuple[Optional[np.ndarray], Optional[np.ndarray], List[str]] = (None, None, [])
+        # status → rule count, tallied in the same pass that selects active rules
+        self._status_counts: Counter = Counter()
+        # query_type → top-K (rule, token estimate) pairs, best first — rebuilt on every load
+        self._scored_by_qtype: Dict[str, List[Tuple[Dict, float]]] = {}
         self._last_mtime: float = 0.0
         self._last_check_time: float = 0.0
         self._lock = asyncio.Lock()
@@ -261,7 +389,7 @@ class GuidelinesManager:
         logger.info(
             f"GuidelinesManager: Loaded. Active: {len(self._active_rules)} | "
             f"Model size: {self._model_size} | "
-            f"Max inject: {'5' if self._model_size == '4B' else '7'} rules"
+            f"Max inject: {self._max_rules} rules"
         )
 
     # ── SYNC FILE LOAD (called from __init__ before event loop) ──────
@@ -275,15 +403,29 @@ class GuidelinesManager:
                 )
                 self._rules = []
                 self._active_rules = []
+                self._emb_index = (None, None, [])
+                self._scored_by_qtype = {}
+                self._status_counts = Counter()
                 self._loaded = True
                 return
 
             mtime = os.path.getmtime(self._path)
-            with open(self._path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            with open(self._path, "rb") as f:
+                data = _loads_json(f.read())
 
             self._rules = data.get("rules", [])
-            self._active_rules = [r for r in self._rules if r.get("status") == "active"]
+            # Single pass: active selection + per-status counts for get_stats()
+            active_rules = []
+            status_counts = Counter()
+            for r in self._rules:
+                status = r.get("status")
+                status_counts[status] += 1
+                if status == "active":
+                    active_rules.append(r)
+            self._active_rules = active_rules
+            self._status_counts = status_counts
+            self._emb_index = build_embedding_matrix(self._active_rules)
+            self._scored_by_qtype = self._rank_by_qtype(self._active_rules)
             self._last_mtime = mtime
             self._loaded = True
 
@@ -298,6 +440,36 @@ class GuidelinesManager:
                 self._rules = []
                 self._active_rules = []
 
+    @property
+    def _max_rules(self) -> int:
+        """Hardware-aware rule count limit."""
+        return 5 if self._model_size == "4B" else 7
+
+    def _rank_for_qtype(self, query_type: str, rules: List[Dict]) -> List[Tuple[Dict, float]]:
+        """
+        Top-K rules for one query_type (stable: ties keep file order), each paired
+        with its token estimate (~4 chars per token) so the budget loop does no len().
+        """
+        def score(rule: Dict) -> float:
+            conf = rule.get("confidence", 0.5)
+            qtypes = rule.get("query_types", ["general"])
+            if query_type in qtypes:
+                return conf * 1.0
+            elif "general" in qtypes:
+                return conf * 0.6
+            else:
+                return conf * 0.3
+
+        top = heapq.nlargest(self._max_rules, rules, key=score)
+        return [(rule, len(rule.get("rule", "")) / 4.0) for rule in top]
+
+    def _rank_by_qtype(self, rules: List[Dict]) -> Dict[str, List[Tuple[Dict, float]]]:
+        """
+        Precomputes the per-query_type ordering at load time so the request
+        path does no scoring or sorting. Runs at most once per reload.
+        """
+        return {qtype: self._rank_for_qtype(qtype, rules) for qtype in QUERY_TYPES}
+
     # ── ASYNC RELOAD (runs inside event loop without blocking it) ─────
 
     async def _async_reload(self) -> None:
@@ -314,7 +486,7 @@ class GuidelinesManager:
     ) -> List[Dict]:
         """
         Returns filtered, scored, hardware-capped list of active rules.
-        Fast path: no file I/O unless cache TTL has expired.
+        Fast path: no lock and no file I/O unless cache TTL has expired.
 
         Args:
             query_type: Intent type from IntentClassifier
@@ -325,50 +497,41 @@ class GuidelinesManager:
         Returns:
             list of rule dicts, best matching rules first, within budget
         """
-        async with self._lock:
-            # Cache invalidation check (max once per TTL seconds)
-            now = time.monotonic()
-            if (now - self._last_check_time) >= self._cache_ttl:
-                try:
-                    current_mtime = os.path.getmtime(self._path)
-                    if current_mtime != self._last_mtime:
-                        await self._async_reload()
-                except FileNotFoundError:
-                    pass  # file deleted — keep existing cache
-                self._last_check_time = now
-
-            if not self._active_rules:
-                return []
-
-            # Score rules by relevance to query_type
-            def score(rule: Dict) -> float:
-                conf = rule.get("confidence", 0.5)
-                qtypes = rule.get("query_types", ["general"])
-                if query_type in qtypes:
-                    return conf * 1.0
-                elif "general" in qtypes:
-                    return conf * 0.6
-                else:
-                    return conf * 0.3
-
-            scored = sorted(self._active_rules, key=score, reverse=True)
-
-            # Hardware-aware rule count limit
-            max_rules = 5 if self._model_size == "4B" else 7
-            scored = scored[:max_rules]
-
-            # Token budget enforcement (~4 chars per token heuristic)
-            selected = []
-            token_count = 0.0
-            for rule in scored:
-                rule_tokens = len(rule.get("rule", "")) / 4.0
-                if token_count + rule_tokens <= token_budget:
-                    selected.append(rule)
-                    token_count += rule_tokens
-                else:
-                    break
-
-            return selected
+        # Fast path (cache warm): lock-free — one monotonic() read + one dict lookup
+        now = time.monotonic()
+        if (now - self._last_check_time) >= self._cache_ttl:
+            async with self._lock:
+                # Re-check: a coroutine queued ahead of us may already have refreshed
+                if (now - self._last_check_time) >= self._cache_ttl:
+                    try:
+                        current_mtime = os.path.getmtime(self._path)
+                        if current_mtime != self._last_mtime:
+                            await self._async_reload()
+                    except FileNotFoundError:
+                        pass  # file deleted — keep existing cache
+                    self._last_check_time = now
+
+        return self._build_response(query_type, token_budget)
+
+    def _build_response(self, query_type: str, token_budget: int) -> List[Dict]:
+        """Pre-ranked rules for query_type, trimmed to the token budget. No awaits, no I/O."""
+        # Pre-ranked at load time; unknown types are ranked once and memoized
+        scored = self._scored_by_qtype.get(query_type)
+        if scored is None:
+            scored = self._rank_for_qtype(query_type, self._active_rules)
+            self._scored_by_qtype[query_type] = scored
+
+        # Token budget enforcement (estimates precomputed at rank time)
+        selected = []
+        token_count = 0.0
+        for rule, rule_tokens in scored:
+            if token_count + rule_tokens <= token_budget:
+                selected.append(rule)
+                token_count += rule_tokens
+            else:
+                break
+
+        return selected
 
     # ── PUBLIC: FORCE RELOAD (called by ReflectionAgent after writes) ─
 
@@ -386,17 +549,24 @@ class GuidelinesManager:
                 f"Total: {len(self._rules)}"
             )
 
+    # ── PUBLIC: EMBEDDING MATRIX (used by ReflectionAgent dedup) ─────
+
+    def get_embedding_matrix(self) -> Tuple[Optional[np.ndarray], Optional[np.ndarray], List[str]]:
+        """
+        Returns the cached (N, 384) int8 matrix of active rule embeddings, its
+        inverse row norms and the parallel id list. Rebuilt on every (force_)reload.
+        """
+        return self._emb_index
+
     # ── PUBLIC: GET STATS (admin endpoint & startup diagnostics) ──────
 
     def get_stats(self) -> Dict[str, Any]:
         """Returns summary statistics. Safe to call synchronously."""
-        active = len([r for r in self._rules if r.get("status") == "active"])
-        retired = len([r for r in self._rules if r.get("status") == "retired"])
-        pending = len([r for r in self._rules if r.get("status") == "pending_review"])
+        counts = self._status_counts  # tallied at load time — no scan here
         return {
-            "active_rules": active,
-            "retired_rules": retired,
-            "pending_review": pending,
+            "active_rules": counts["active"],
+            "retired_rules": counts["retired"],
+            "pending_review": counts["pending_review"],
             "total_rules": len(self._rules),
             "model_size": self._model_size,
             "guidelines_path": self._path,
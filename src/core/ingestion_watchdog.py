@@ -30,6 +30,9 @@ class IngestionWatchdog:
     for too long (indicating a crash), it orchestrates a resumption from the 'last_chunk_index'.
     """
     
+    # Worst-case rows handled per sweep; leftovers are picked up on the next interval
+    _MAX_JOBS_PER_SWEEP = 100
+    
     def __init__(self, check_interval_seconds: int = 300, stale_timeout_minutes: int = 30):
         self.interval = check_interval_seconds
         self.stale_timeout = stale_timeout_minutes
@@ -70,22 +73,28 @@ class IngestionWatchdog:
                 SELECT id, file_name, last_chunk_index
                 FROM ingestion_status
                 WHERE status = 'IN_PROGRESS' AND updated_at < ?
+                LIMIT ?
                 """,
-                (threshold_time,)
+                (threshold_time, self._MAX_JOBS_PER_SWEEP)
             )
             stalled_jobs = cursor.fetchall()
+            if not stalled_jobs:
+                return
+            
+            logger.warning(
+                f"🚨 Watchdog detected {len(stalled_jobs)} stalled ingestion(s): "
+                + ", ".join(f"{job['file_name']} (chunk {job['last_chunk_index']})" for job in stalled_jobs)
+                + ". Attempting to self-heal..."
+            )
             
-            for job in stalled_jobs:
-                logger.warning(
-                    f"🚨 Watchdog detected stalled ingestion for {job['file_name']} "
-                    f"at chunk {job['last_chunk_index']}. Attempting to self-heal..."
-                )
-                
-                # In a full SOTA implementation, this would push back into a queue or 
-                # trigger the DocumentProcessor to resume from job['last_chunk_index'].
-                # For Phase 4 remediation, we mark it as FAILED so the UI knows to retry.
-                cursor.execute(
-                    "UPDATE ingestion_status SET status = 'FAILED', updated_at = ? WHERE id = ?",
-                    (datetime.utcnow().isoformat(), job['id'])
-                )
-                logger.info(f"Job {job['id']} marked as FAILED for manual retry.")
+            # In a full SOTA implementation, this would push back into a queue or 
+            # trigger the DocumentProcessor to resume from job['last_chunk_index'].
+            # For Phase 4 remediation, we mark them as FAILED so the UI knows to retry.
+            # One statement for the whole sweep (<= _MAX_JOBS_PER_SWEEP ids, well under SQLite's bound-parameter cap).
+            ids = [job['id'] for job in stalled_jobs]
+            placeholders = ",".join("?" * len(ids))
+            cursor.execute(
+                f"UPDATE ingestion_status SET status = 'FAILED', updated_at = ? WHERE id IN ({placeholders})",
+                (datetime.utcnow().isoformat(), *ids)
+            )
+            logger.info(f"Watchdog marked {len(ids)} job(s) as FAILED for manual retry: {', '.join(ids)}")
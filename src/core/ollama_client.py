@@ -28,14 +28,77 @@ import time
 import httpx
 import logging
 import asyncio
+import functools
 from typing import Dict, List, Optional, Any, Union, AsyncGenerator, Callable
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from .config import OllamaConfig, Config
 from .utils import logger
 
 # Singleton instance
 _client_instance = None
 
+# One pooled keep-alive AsyncClient per event loop, shared by EVERY OllamaClient
+# (the singleton and the short-lived ones built by memory/healer/translator/...).
+# Closed once at shutdown via close_http_pool().
+_http_pool: Optional[httpx.AsyncClient] = None
+_http_pool_loop: Optional[asyncio.AbstractEventLoop] = None
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _encode_payload(payload: Dict) -> bytes:
+    """Serialize a request body straight to UTF-8 bytes (orjson when available)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def _decode_line(line: Union[str, bytes]) -> Dict:
+    """Parse one NDJSON stream line; raises ValueError on malformed input."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+def _get_http_pool() -> httpx.AsyncClient:
+    """
+    Return the shared AsyncClient for the running loop. A client is bound to the
+    loop it was created on, so a new one is built if the loop changed; the old
+    one is closed on its own loop when that loop is still alive.
+    """
+    global _http_pool, _http_pool_loop
+    loop = asyncio.get_running_loop()
+    if _http_pool is not None and not _http_pool.is_closed and _http_pool_loop is loop:
+        return _http_pool
+
+    stale, stale_loop = _http_pool, _http_pool_loop
+    if stale is not None and not stale.is_closed:
+        if stale_loop is not None and not stale_loop.is_closed():
+            asyncio.run_coroutine_threadsafe(stale.aclose(), stale_loop)
+        else:
+            logger.debug("OllamaClient: dropping pooled client of a closed event loop")
+
+    _http_pool = httpx.AsyncClient(
+        timeout=httpx.Timeout(OllamaConfig.TIMEOUT, connect=5.0),
+        limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=60.0)
+    )
+    _http_pool_loop = loop
+    return _http_pool
+
+
+async def close_http_pool() -> None:
+    """Close the shared Ollama connection pool (application shutdown / legacy sync wrapper)."""
+    global _http_pool, _http_pool_loop
+    client, _http_pool, _http_pool_loop = _http_pool, None, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
 
 # =============================================================================
 # OLLAMA CLIENT
@@ -69,13 +132,12 @@ class OllamaClient:
     async def is_available(self) -> bool:
         """Check if Ollama is running and model is available"""
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get(f"{self.base_url}/api/tags")
-                if response.status_code == 200:
-                    models = response.json().get("models", [])
-                    model_names = [m.get("name", "").split(":")[0] for m in models]
-                    return self.model_name.split(":")[0] in model_names or len(models) > 0
-                return False
+            response = await _get_http_pool().get(f"{self.base_url}/api/tags", timeout=5.0)
+            if response.status_code == 200:
+                models = response.json().get("models", [])
+                model_names = [m.get("name", "").split(":")[0] for m in models]
+                return self.model_name.split(":")[0] in model_names or len(models) > 0
+            return False
         except Exception as e:
             logger.debug(f"Ollama availability check failed: {e}")
             return False
@@ -120,6 +182,7 @@ class OllamaClient:
             "model": model or self.model_name,
             "prompt": prompt,
             "stream": stream,
+            "keep_alive": OllamaConfig.KEEP_ALIVE,
             "options": {
                 "temperature": temperature,
                 "num_predict": max_tokens,
@@ -173,42 +236,46 @@ class OllamaClient:
         """Asynchronous generation (non-streaming) - returns {'response': str, 'done_reason': str}"""
         if check_abort_fn and check_abort_fn(): return {"response": "Aborted", "done": True}
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.post(
-                f"{self.base_url}/api/generate",
-                json=payload
-            )
-            
-            if response.status_code != 200:
-                raise RuntimeError(f"Ollama API error: {response.status_code} - {response.text}")
-            
-            result = response.json()
-            return {
-                "response": result.get("response", ""),
-                "done_reason": result.get("done_reason", "stop")
-            }
+        response = await _get_http_pool().post(
+            f"{self.base_url}/api/generate",
+            content=_encode_payload(payload),
+            headers=_JSON_HEADERS,
+            timeout=self.timeout
+        )
+        
+        if response.status_code != 200:
+            raise RuntimeError(f"Ollama API error: {response.status_code} - {response.text}")
+        
+        result = response.json()
+        return {
+            "response": result.get("response", ""),
+            "done_reason": result.get("done_reason", "stop")
+        }
     
     async def _generate_stream(self, payload: Dict, check_abort_fn: Optional[callable] = None) -> AsyncGenerator[Dict[str, Any], None]:
         """Asynchronous streaming generation - yields JSON dicts"""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            async with client.stream("POST", f"{self.base_url}/api/generate", json=payload) as response:
-                if response.status_code != 200:
-                    error_text = await response.aread()
-                    raise RuntimeError(f"Ollama API error {response.status_code}: {error_text.decode('utf-8')}")
-                
-                async for line in response.aiter_lines():
-                    # ── STRICT ABORT CHECK: Terminate stream immediately ──
-                    if check_abort_fn and check_abort_fn():
-                        logger.info("Abort signaled during Ollama stream. Terminating.")
-                        yield {"done": True, "response": "Aborted"}
-                        return
+        async with _get_http_pool().stream(
+            "POST", f"{self.base_url}/api/generate",
+            content=_encode_payload(payload), headers=_JSON_HEADERS,
+            timeout=self.timeout
+        ) as response:
+            if response.status_code != 200:
+                error_text = await response.aread()
+                raise RuntimeError(f"Ollama API error {response.status_code}: {error_text.decode('utf-8')}")
+            
+            async for line in response.aiter_lines():
+                # ── STRICT ABORT CHECK: Terminate stream immediately ──
+                if check_abort_fn and check_abort_fn():
+                    logger.info("Abort signaled during Ollama stream. Terminating.")
+                    yield {"done": True, "response": "Aborted"}
+                    return
 
-                    if line:
-                        try:
-                            # Ollama streams JSON line-by-line
-                            yield json.loads(line)
-                        except json.JSONDecodeError:
-                            continue
+                if line:
+                    try:
+                        # Ollama streams JSON line-by-line
+                        yield _decode_line(line)
+                    except ValueError:
+                        continue
     
     async def chat(
         self,
@@ -226,6 +293,7 @@ class OllamaClient:
             "model": self.model_name,
             "messages": messages,
             "stream": False,
+            "keep_alive": OllamaConfig.KEEP_ALIVE,
             "options": {
                 "temperature": temperature,
                 "num_predict": max_tokens
@@ -233,20 +301,21 @@ class OllamaClient:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/chat",
-                    json=payload
-                )
-                
-                if response.status_code != 200:
-                    raise RuntimeError(f"Ollama chat API error: {response.status_code}")
-                
-                result = response.json()
-                return {
-                    "message": result.get("message", {}).get("content", ""),
-                    "done_reason": result.get("done_reason", "stop")
-                }
+            response = await _get_http_pool().post(
+                f"{self.base_url}/api/chat",
+                content=_encode_payload(payload),
+                headers=_JSON_HEADERS,
+                timeout=self.timeout
+            )
+            
+            if response.status_code != 200:
+                raise RuntimeError(f"Ollama chat API error: {response.status_code}")
+            
+            result = response.json()
+            return {
+                "message": result.get("message", {}).get("content", ""),
+                "done_reason": result.get("done_reason", "stop")
+            }
                 
         except httpx.ConnectError:
             raise RuntimeError(
@@ -259,19 +328,20 @@ class OllamaClient:
             try:
                 fallback = Config.ollama_multi_model.LIGHTWEIGHT_MODEL
                 payload["model"] = fallback
-                async with httpx.AsyncClient(timeout=self.timeout) as client:
-                    response = await client.post(
-                        f"{self.base_url}/api/chat",
-                        json=payload
-                    )
-                    if response.status_code != 200:
-                        raise RuntimeError(f"Ollama fallback chat API error: {response.status_code}")
-                    result = response.json()
-                    logger.info(f"✅ SOTA Self-Healing: Chat Fallback to '{fallback}' succeeded.")
-                    return {
-                        "message": result.get("message", {}).get("content", ""),
-                        "done_reason": result.get("done_reason", "stop")
-                    }
+                response = await _get_http_pool().post(
+                    f"{self.base_url}/api/chat",
+                    content=_encode_payload(payload),
+                    headers=_JSON_HEADERS,
+                    timeout=self.timeout
+                )
+                if response.status_code != 200:
+                    raise RuntimeError(f"Ollama fallback chat API error: {response.status_code}")
+                result = response.json()
+                logger.info(f"✅ SOTA Self-Healing: Chat Fallback to '{fallback}' succeeded.")
+                return {
+                    "message": result.get("message", {}).get("content", ""),
+                    "done_reason": result.get("done_reason", "stop")
+                }
             except Exception as fallback_error:
                 logger.error(f"❌ SOTA Self-Healing: Chat Fallback model also failed: {fallback_error}")
                 raise RuntimeError(f"Ollama chat generation and fallback failed: {e}")
@@ -288,6 +358,21 @@ def get_ollama_client() -> OllamaClient:
         _client_instance = OllamaClient()
     return _client_instance
 
+
+@functools.lru_cache(maxsize=8)
+def get_ollama_llm(model: str, base_url: Optional[str] = None, timeout: Optional[int] = None):
+    """
+    Shared LangChain OllamaLLM per (model, base_url, timeout).
+    Agents built per request (e.g. DeepInsightAgent) reuse the same wrapper and its
+    keep-alive connection pool instead of constructing fresh clients on every call.
+    """
+    from langchain_ollama import OllamaLLM
+    return OllamaLLM(
+        model=model,
+        base_url=base_url or Config.ollama.BASE_URL,
+        timeout=timeout if timeout is not None else Config.ollama.TIMEOUT
+    )
+
 # We keep this as synchronous for legacy code compatibility, 
 # but warn that agents should use the actual await client.generate() instead.
 def generate_with_ollama(
@@ -309,4 +394,11 @@ def generate_with_ollama(
     except RuntimeError:
         pass
     
-    return asyncio.run(client.generate(prompt, temperature=temperature, max_tokens=max_tokens))
+    async def _run_once():
+        # Private loop: release its pooled connections before asyncio.run closes it
+        try:
+            return await client.generate(prompt, temperature=temperature, max_tokens=max_tokens)
+        finally:
+            await close_http_pool()
+
+    return asyncio.run(_run_once())
@@ -26,9 +26,12 @@ Database type is selected via DB_TYPE environment variable.
 import os
 import uuid
 import json
+import queue
 import sqlite3
+import hashlib
+import threading
 from abc import ABC, abstractmethod
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 from contextlib import contextmanager
 from pathlib import Path
@@ -103,6 +106,11 @@ class BaseDatabase(ABC):
         """Add a message to a conversation."""
         pass
     
+    @abstractmethod
+    def add_messages(self, conversation_id: str, messages: List[Dict]) -> List[str]:
+        """Add several messages ({role, content, metadata?, token_count?}) in one transaction."""
+        pass
+    
     @abstractmethod
     def get_messages(self, conversation_id: str) -> List[Dict]:
         """Get all messages for a conversation."""
@@ -129,10 +137,86 @@ class BaseDatabase(ABC):
         pass
 
 
+def _content_hash(content: str) -> int:
+    """
+    Signed 64-bit digest of the normalized (strip + lower) message text.
+    Indexed alongside conversation_id so duplicate-query lookups are an index
+    seek instead of a LOWER(TRIM(content)) scan over the whole conversation.
+    """
+    digest = hashlib.blake2b(content.strip().lower().encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
 # =============================================================================
 # SQLITE DATABASE IMPLEMENTATION
 # =============================================================================
 
+class _SQLiteConnectionPool:
+    """
+    Thread-safe pool of long-lived sqlite3 connections (the SQLite counterpart of
+    psycopg2's ThreadedConnectionPool used by the PostgreSQL backend).
+    Connections are configured once by the factory, so PRAGMAs and each connection's
+    page cache persist across calls, and concurrent asyncio.to_thread callers get
+    separate connections instead of interleaving transactions on one shared handle.
+    LIFO reuse keeps the most recently used (hottest) connection in rotation.
+    """
+
+    def __init__(self, factory, min_size: int = 2, max_size: int = 8, timeout: float = 30.0):
+        self._factory = factory
+        self._max_size = max(1, max_size)
+        self._timeout = timeout
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all: List[sqlite3.Connection] = []
+        self._size = 0  # opened + reserved slots, so concurrent growth never overshoots max_size
+        self._lock = threading.Lock()
+        for _ in range(min(min_size, self._max_size)):
+            with self._lock:
+                self._size += 1
+            self._idle.put(self._open())
+
+    def _open(self) -> sqlite3.Connection:
+        """Open a connection for an already-reserved slot."""
+        try:
+            conn = self._factory()
+        except Exception:
+            with self._lock:
+                self._size -= 1
+            raise
+        with self._lock:
+            self._all.append(conn)
+        return conn
+
+    def getconn(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_grow = self._size < self._max_size
+            if can_grow:
+                self._size += 1
+        if can_grow:
+            return self._open()
+        try:
+            return self._idle.get(timeout=self._timeout)
+        except queue.Empty:
+            raise RuntimeError(f"SQLite connection pool exhausted ({self._max_size} connections busy)")
+
+    def putconn(self, conn: sqlite3.Connection):
+        self._idle.put(conn)
+
+    def closeall(self):
+        with self._lock:
+            for conn in self._all:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._all.clear()
+            self._size = 0
+        self._idle = queue.LifoQueue()
+
+
 class SQLiteDatabase(BaseDatabase):
     """
     SQLite database implementation.
@@ -148,25 +232,45 @@ class SQLiteDatabase(BaseDatabase):
         """
         default_path = Path(__file__).parent.parent.parent / "data" / "SpandaOS.db"
         self.db_path = Path(db_path) if db_path else default_path
-        self._connection: Optional[sqlite3.Connection] = None
+        self._pool: Optional[_SQLiteConnectionPool] = None
         self._connected = False
     
+    def _open_connection(self) -> sqlite3.Connection:
+        """Pool factory: open one connection and apply per-connection PRAGMAs exactly once."""
+        # Connect with row factory for dict-like access
+        conn = sqlite3.connect(
+            str(self.db_path),
+            check_same_thread=False,  # Pooled connections are handed across threads (FastAPI)
+            timeout=30.0
+        )
+        conn.row_factory = sqlite3.Row
+        
+        # Enable foreign keys
+        conn.execute("PRAGMA foreign_keys = ON")
+        
+        # WAL: commits append to the log (one fsync) instead of the rollback journal's two,
+        # and readers no longer block the writer. NORMAL sync is durable in WAL mode
+        # except for the last commits on power loss.
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA cache_size = -65536")      # 64 MiB page cache
+        conn.execute("PRAGMA mmap_size = 268435456")    # 256 MiB memory-mapped reads
+        return conn
+    
     def connect(self) -> bool:
-        """Establish connection to SQLite database."""
+        """Establish the SQLite connection pool."""
         try:
             # Ensure directory exists
             self.db_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Connect with row factory for dict-like access
-            self._connection = sqlite3.connect(
-                str(self.db_path),
-                check_same_thread=False,  # Allow multi-thread access (FastAPI)
-                timeout=30.0
+            # An in-memory database is private to its connection — it cannot be pooled
+            in_memory = str(self.db_path) == ":memory:"
+            self._pool = _SQLiteConnectionPool(
+                self._open_connection,
+                min_size=1 if in_memory else int(os.getenv("SQLITE_POOL_MIN", "2")),
+                max_size=1 if in_memory else int(os.getenv("SQLITE_POOL_MAX", "8"))
             )
-            self._connection.row_factory = sqlite3.Row
-            
-            # Enable foreign keys
-            self._connection.execute("PRAGMA foreign_keys = ON")
             
             self._connected = True
             logger.info(f"SQLite database connected: {self.db_path}")
@@ -177,31 +281,34 @@ class SQLiteDatabase(BaseDatabase):
             return False
     
     def disconnect(self):
-        """Close SQLite connection."""
-        if self._connection:
-            self._connection.close()
+        """Close all pooled SQLite connections."""
+        if self._pool:
+            self._pool.closeall()
+            self._pool = None
             self._connected = False
             logger.info("SQLite connection closed")
     
     def is_connected(self) -> bool:
         """Check if database is connected."""
-        return self._connected and self._connection is not None
+        return self._connected and self._pool is not None
     
     @contextmanager
     def get_cursor(self):
-        """Get a cursor with automatic commit/rollback."""
-        if not self._connection:
+        """Get a cursor on a pooled connection with automatic commit/rollback."""
+        if not self._pool:
             raise RuntimeError("Database not connected")
         
-        cursor = self._connection.cursor()
+        conn = self._pool.getconn()
+        cursor = conn.cursor()
         try:
             yield cursor
-            self._connection.commit()
+            conn.commit()
         except Exception:
-            self._connection.rollback()
+            conn.rollback()
             raise
         finally:
             cursor.close()
+            self._pool.putconn(conn)
     
     def initialize_schema(self):
         """Create tables if they don't exist (ChatGPT-style schema)."""
@@ -248,6 +355,7 @@ class SQLiteDatabase(BaseDatabase):
             token_count             INTEGER,
             duplicate_count         INTEGER DEFAULT 0,
             feedback_score          INTEGER DEFAULT NULL,
+            content_hash            INTEGER DEFAULT NULL,
             message_created_at      TEXT DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (conversation_id) REFERENCES conversations(conversation_id) ON DELETE CASCADE,
             FOREIGN KEY (parent_message_id) REFERENCES messages(message_id) ON DELETE CASCADE
@@ -294,6 +402,9 @@ class SQLiteDatabase(BaseDatabase):
             created_at              TEXT DEFAULT CURRENT_TIMESTAMP,
             updated_at              TEXT DEFAULT CURRENT_TIMESTAMP
         );
+        
+        CREATE INDEX IF NOT EXISTS idx_ingest_status_updated
+            ON ingestion_status(status, updated_at);
 
         -- Phase 5: Prompt Injection Security Logs
         CREATE TABLE IF NOT EXISTS security_logs (
@@ -328,6 +439,27 @@ class SQLiteDatabase(BaseDatabase):
                 except Exception as e:
                     logger.error(f"Failed to add feedback_score column: {e}")
 
+            # 2. Add content_hash (duplicate-query index) and backfill user turns
+            try:
+                cursor.execute("SELECT content_hash FROM messages LIMIT 1")
+            except Exception:
+                logger.info("⚡ Migrating SQLite: Adding 'content_hash' column to 'messages' table.")
+                try:
+                    cursor.execute("ALTER TABLE messages ADD COLUMN content_hash INTEGER DEFAULT NULL")
+                except Exception as e:
+                    logger.error(f"Failed to add content_hash column: {e}")
+            try:
+                cursor.execute("SELECT message_id, content FROM messages WHERE role = 'user' AND content_hash IS NULL")
+                backfill = [(_content_hash(row['content']), row['message_id']) for row in cursor.fetchall()]
+                if backfill:
+                    cursor.executemany("UPDATE messages SET content_hash = ? WHERE message_id = ?", backfill)
+                    logger.info(f"✅ Backfilled content_hash for {len(backfill)} user messages.")
+                cursor.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_messages_conv_hash ON messages(conversation_id, content_hash)"
+                )
+            except Exception as e:
+                logger.error(f"Failed to build content_hash index: {e}")
+
     def create_conversation(self, title: Optional[str] = None, user_id: str = "default", conversation_id: Optional[str] = None) -> str:
         """Create a new conversation."""
         conversation_id = conversation_id or str(uuid.uuid4())
@@ -454,10 +586,10 @@ class SQLiteDatabase(BaseDatabase):
             # Insert message
             cursor.execute(
                 """
-                INSERT INTO messages (message_id, conversation_id, role, content, metadata_json, token_count, message_created_at, parent_message_id)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                INSERT INTO messages (message_id, conversation_id, role, content, metadata_json, token_count, message_created_at, parent_message_id, content_hash)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
-                (message_id, conversation_id, role, content, metadata_json, token_count, now, parent_id)
+                (message_id, conversation_id, role, content, metadata_json, token_count, now, parent_id, _content_hash(content))
             )
             
             # Update conversation's updated_at
@@ -471,6 +603,57 @@ class SQLiteDatabase(BaseDatabase):
         
         return message_id
     
+    def add_messages(self, conversation_id: str, messages: List[Dict]) -> List[str]:
+        """
+        Add several messages in ONE transaction (single commit/fsync).
+        Timestamps are spaced by 1µs so insertion order is preserved without sleeping.
+        """
+        if not messages:
+            return []
+        base = datetime.utcnow()
+        rows, message_ids = [], []
+        
+        with self.get_cursor() as cursor:
+            # Parent linking: latest user message in this batch, else the latest in the DB
+            last_user_id = None
+            for i, msg in enumerate(messages):
+                message_id = str(uuid.uuid4())
+                parent_id = None
+                if msg["role"] == "assistant":
+                    if last_user_id is None:
+                        cursor.execute(
+                            "SELECT message_id FROM messages WHERE conversation_id = ? AND role = 'user' ORDER BY message_created_at DESC LIMIT 1",
+                            (conversation_id,)
+                        )
+                        row = cursor.fetchone()
+                        last_user_id = row['message_id'] if row else None
+                    parent_id = last_user_id
+                elif msg["role"] == "user":
+                    last_user_id = message_id
+                
+                metadata = msg.get("metadata")
+                rows.append((
+                    message_id, conversation_id, msg["role"], msg["content"],
+                    json.dumps(metadata) if metadata else None, msg.get("token_count"),
+                    (base + timedelta(microseconds=i)).isoformat(), parent_id,
+                    _content_hash(msg["content"])
+                ))
+                message_ids.append(message_id)
+            
+            cursor.executemany(
+                """
+                INSERT INTO messages (message_id, conversation_id, role, content, metadata_json, token_count, message_created_at, parent_message_id, content_hash)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows
+            )
+            cursor.execute(
+                "UPDATE conversations SET conversation_updated_at = ? WHERE conversation_id = ?",
+                (rows[-1][6], conversation_id)
+            )
+        
+        return message_ids
+    
     def get_messages(self, conversation_id: str) -> List[Dict]:
         """Get all messages for a conversation."""
         with self.get_cursor() as cursor:
@@ -498,20 +681,23 @@ class SQLiteDatabase(BaseDatabase):
         CRITICAL: Skips terminated responses (force-stopped by user) to ensure fresh generation.
         """
         query_clean = query.strip().lower()
+        query_hash = _content_hash(query)
         with self.get_cursor() as cursor:
+            # content_hash hits idx_messages_conv_hash; the text compare only guards collisions
             cursor.execute(
                 """
                 SELECT m2.content, m2.metadata_json
                 FROM messages m1
                 JOIN messages m2 ON m2.parent_message_id = m1.message_id
                 WHERE m1.conversation_id = ? 
+                  AND m1.content_hash = ?
                   AND m1.role = 'user' 
                   AND LOWER(TRIM(m1.content)) = ?
                   AND m2.role = 'assistant'
                 ORDER BY m1.message_created_at DESC
                 LIMIT 1
                 """,
-                (conversation_id, query_clean)
+                (conversation_id, query_hash, query_clean)
             )
             row = cursor.fetchone()
             if row:
@@ -532,6 +718,7 @@ class SQLiteDatabase(BaseDatabase):
                 FROM messages m1
                 JOIN messages m2 ON m2.conversation_id = m1.conversation_id
                 WHERE m1.conversation_id = ? 
+                  AND m1.content_hash = ?
                   AND m1.role = 'user' 
                   AND LOWER(TRIM(m1.content)) = ?
                   AND m2.role = 'assistant'
@@ -539,7 +726,7 @@ class SQLiteDatabase(BaseDatabase):
                 ORDER BY m1.message_created_at DESC, m2.message_created_at ASC
                 LIMIT 1
                 """,
-                (conversation_id, query_clean)
+                (conversation_id, query_hash, query_clean)
             )
             row = cursor.fetchone()
             if row:
@@ -1037,6 +1224,52 @@ class PostgreSQLDatabase(BaseDatabase):
         
         return message_id
     
+    def add_messages(self, conversation_id: str, messages: List[Dict]) -> List[str]:
+        """Add several messages in ONE transaction; 1µs offsets preserve insertion order."""
+        if not messages:
+            return []
+        rows, message_ids = [], []
+        
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                last_user_id = None
+                for i, msg in enumerate(messages):
+                    message_id = str(uuid.uuid4())
+                    parent_id = None
+                    if msg["role"] == "assistant":
+                        if last_user_id is None:
+                            cur.execute(
+                                "SELECT message_id FROM messages WHERE conversation_id = %s AND role = 'user' ORDER BY message_created_at DESC LIMIT 1",
+                                (conversation_id,)
+                            )
+                            row = cur.fetchone()
+                            last_user_id = row[0] if row else None
+                        parent_id = last_user_id
+                    elif msg["role"] == "user":
+                        last_user_id = message_id
+                    
+                    metadata = msg.get("metadata")
+                    rows.append((
+                        message_id, conversation_id, msg["role"], msg["content"],
+                        json.dumps(metadata) if metadata else None, msg.get("token_count"),
+                        i, parent_id
+                    ))
+                    message_ids.append(message_id)
+                
+                cur.executemany(
+                    """
+                    INSERT INTO messages (message_id, conversation_id, role, content, metadata_json, token_count, message_created_at, parent_message_id)
+                    VALUES (%s, %s, %s, %s, %s, %s, NOW() + %s * INTERVAL '1 microsecond', %s)
+                    """,
+                    rows
+                )
+                cur.execute(
+                    "UPDATE conversations SET conversation_updated_at = NOW() WHERE conversation_id = %s",
+                    (conversation_id,)
+                )
+        
+        return message_ids
+    
     def get_messages(self, conversation_id: str) -> List[Dict]:
         """Get all messages for a conversation."""
         from psycopg2.extras import RealDictCursor
@@ -1271,6 +1504,9 @@ class DatabaseManager:
     def add_message(self, conversation_id: str, role: str, content: str, metadata: Optional[Dict] = None, token_count: Optional[int] = None) -> str:
         return self._backend.add_message(conversation_id, role, content, metadata, token_count)
     
+    def add_messages(self, conversation_id: str, messages: List[Dict]) -> List[str]:
+        return self._backend.add_messages(conversation_id, messages)
+    
     def get_messages(self, conversation_id: str) -> List[Dict]:
         return self._backend.get_messages(conversation_id)
     
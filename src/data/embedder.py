@@ -168,18 +168,21 @@ class DeterministicEmbedder:
         show_progress: bool = False
     ) -> np.ndarray:
         """Encode batch of texts with partial cache lookup"""
-        embeddings = []
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        # cache_key -> original indices still needing an embedding (dedupes repeats in-batch)
+        pending: Dict[str, List[int]] = {}
         texts_to_encode = []
-        text_indices = []
         
-        # Check cache for each text
+        # Check cache for each text (keys hashed exactly once per text)
         for i, text in enumerate(texts):
             cache_key = self._get_cache_key(text)
             if self.use_cache and cache_key in self.cache:
-                embeddings.append((i, self.cache[cache_key]))
+                results[i] = self.cache[cache_key]
+            elif cache_key in pending:
+                pending[cache_key].append(i)
             else:
+                pending[cache_key] = [i]
                 texts_to_encode.append(text)
-                text_indices.append(i)
         
         # Encode uncached texts
         if texts_to_encode:
@@ -190,18 +193,14 @@ class DeterministicEmbedder:
                 batch_size=EmbeddingConfig.BATCH_SIZE
             )
             
-            # Cache new embeddings
-            for text, embedding in zip(texts_to_encode, new_embeddings):
-                cache_key = self._get_cache_key(text)
+            # Cache new embeddings; pending preserves first-seen order == texts_to_encode order
+            for (cache_key, indices), embedding in zip(pending.items(), new_embeddings):
                 if self.use_cache:
                     self.cache[cache_key] = embedding
-                embeddings.append((text_indices[texts_to_encode.index(text)], embedding))
+                for i in indices:
+                    results[i] = embedding
         
-        # Sort by original index and extract embeddings
-        embeddings.sort(key=lambda x: x[0])
-        result = np.array([e[1] for e in embeddings])
-        
-        return result
+        return np.array(results)
     
     def save_cache(self) -> None:
         """Manually save cache to disk"""
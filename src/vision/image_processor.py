@@ -31,7 +31,6 @@ import json
 import asyncio
 from typing import Dict, List, Optional, Callable
 from PIL import Image
-import torch
 
 from ..core.utils import logger
 from .qwen_agent import get_vision_agent
@@ -57,6 +56,7 @@ class ImageProcessor:
     def _get_ocr_reader(self):
         if self.ocr_reader is None:
             try:
+                import torch
                 import easyocr
                 
                 # SOTA VRAM Management: Clear cache before initializing EasyOCR
@@ -104,6 +104,7 @@ class ImageProcessor:
             (mid_w, mid_h, w, h)
         ]
         
+        import torch
         tile_descriptions = []
         quad_labels = ["Top-Left", "Top-Right", "Bottom-Left", "Bottom-Right"]
         
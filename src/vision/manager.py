@@ -23,6 +23,7 @@ Orchestrates between Image, Audio, and Video pipelines.
 """
 
 from typing import Dict, Optional, List, Callable
+import asyncio
 import hashlib
 from pathlib import Path
 
@@ -43,8 +44,9 @@ class MultimodalManager:
         self.audio_proc = AudioProcessor()
         self.video_proc = VideoProcessor()
         self.enricher = ContentEnricher()
-        # SOTA: Atomic Locking to prevent race conditions during parallel uploads
-        self._processing_locks = set()
+        # SOTA: Atomic Locking to prevent race conditions during parallel uploads.
+        # lock_id -> Event set on release, so waiters wake immediately instead of polling.
+        self._processing_locks: Dict[str, asyncio.Event] = {}
 
     def get_file_hash(self, file_path: str) -> str:
         """Calculate SHA-256 hash of a file."""
@@ -68,9 +70,8 @@ class MultimodalManager:
         lock_id = f"{conversation_id}_{file_hash}"
         if lock_id in self._processing_locks:
             logger.info(f"File {file_name} is currently being processed. Waiting for lock...")
-            import asyncio
-            while lock_id in self._processing_locks:
-                await asyncio.sleep(1.0)
+            while (release_event := self._processing_locks.get(lock_id)) is not None:
+                await release_event.wait()
             logger.info(f"Lock released for {file_name}. Retrying registry check.")
 
         existing_doc = self.db.get_document_by_hash(file_hash, conversation_id=conversation_id)
@@ -111,7 +112,7 @@ class MultimodalManager:
             logger.info(f"Abort signaled before processing {file_name}. Terminating.")
             return {"status": "aborted", "file_name": file_name}
 
-        self._processing_locks.add(lock_id)
+        self._processing_locks[lock_id] = asyncio.Event()
         try:
             from ..core.utils import get_file_category
             normalized_type = get_file_category(file_type)
@@ -141,20 +142,19 @@ class MultimodalManager:
                 file_path=file_path
             )
             
-            # 3a. Save Legacy Scraped Content
-            raw_full_content = []
-            for idx, item in enumerate(scraped_items):
-                content_text = item['content']
-                raw_full_content.append(content_text)
-                self.db.add_scraped_content(
-                    file_id=file_id,
-                    content=content_text,
-                    sub_type=item.get('sub_type', 'text'),
-                    chunk_index=idx,
-                    timestamp=item.get('timestamp'),
-                    page_number=item.get('page_number'),
-                    metadata={'type': item.get('type', item.get('sub_type', 'general'))}
-                )
+            # 3a. Save Legacy Scraped Content (one batched LanceDB append for all items)
+            raw_full_content = [item['content'] for item in scraped_items]
+            self.db.add_scraped_contents(file_id, [
+                {
+                    "content": item['content'],
+                    "sub_type": item.get('sub_type', 'text'),
+                    "chunk_index": idx,
+                    "timestamp": item.get('timestamp'),
+                    "page_number": item.get('page_number'),
+                    "metadata": {'type': item.get('type', item.get('sub_type', 'general'))}
+                }
+                for idx, item in enumerate(scraped_items)
+            ])
             
             # 3b. Unified Enrichment Pipeline (New Architecture: Background Task)
             enrichment_task = None
@@ -164,7 +164,6 @@ class MultimodalManager:
                 if existing_enriched:
                     logger.info(f"Enriched content already exists for {file_name}, skipping redundant re-enrichment.")
                 else:
-                    import asyncio
                     full_raw_text = "\n\n".join(raw_full_content)
                     
                     # Launch background enrichment and store the task
@@ -189,9 +188,10 @@ class MultimodalManager:
             }
 
         finally:
-            # Release lock
-            if lock_id in self._processing_locks:
-                self._processing_locks.remove(lock_id)
+            # Release lock and wake every waiter
+            release_event = self._processing_locks.pop(lock_id, None)
+            if release_event is not None:
+                release_event.set()
 
     async def _background_enrichment(self, file_id: str, conversation_id: str, full_raw_text: str, normalized_type: str, file_name: str, check_abort_fn: Optional[Callable] = None):
         """Helper to run enrichment in the background and persist to DB."""
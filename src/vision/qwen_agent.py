@@ -24,11 +24,15 @@ Optimized for 6GB VRAM using 4-bit quantization and CPU offloading.
 """
 
 import os
-import torch
+import asyncio
+import threading
 from typing import List, Dict, Optional
 from PIL import Image
 from ..core.utils import logger
 
+# Free VRAM needed to load Qwen2-VL-2B unquantized (fp16 weights + activation headroom)
+FP16_MIN_FREE_VRAM_GB = 6.0
+
 class QwenVisionAgent:
     """Agent 3: Vision Perception Agent (Qwen2-VL-2B)"""
     
@@ -36,12 +40,20 @@ class QwenVisionAgent:
         self.model_id = model_id
         self.model = None
         self.processor = None
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        # Rendered chat templates keyed by prompt — the image slot renders to the same
+        # placeholder tokens for every image, so only the prompt text varies.
+        self._template_cache: Dict[str, str] = {}
+        # Serializes GPU generations (created lazily inside the running loop)
+        self._gpu_lock: Optional[asyncio.Lock] = None
+        self._load_lock = threading.Lock()
+        # Resolved in _lazy_load — torch is imported on first use, not at module import
+        self.device = "cpu"
 
     def _check_gpu_health(self):
         """Forensic GPU diagnostic for SpandaOS Elite."""
         logger.info("🕵️ GPU Diagnostic: Running health check...")
         try:
+            import torch
             torch_ver = torch.__version__
             cuda_avail = torch.cuda.is_available()
             logger.info(f"  - PyTorch Version: {torch_ver}")
@@ -64,10 +76,16 @@ class QwenVisionAgent:
             logger.error(f"  - GPU Diagnostic failed: {e}")
 
     def _lazy_load(self):
-        """Load model with adaptive configuration (4-bit for GPU, standard for CPU)."""
+        """Load the model once; safe to call from warm-up and inference threads concurrently."""
         if self.model is not None:
             return
+        with self._load_lock:
+            if self.model is None:
+                self._load_model()
 
+    def _load_model(self):
+        """Load model with adaptive configuration (4-bit for GPU, standard for CPU)."""
+        import torch
         self._check_gpu_health()
         
         logger.info(f"Loading Qwen2-VL-2B from HuggingFace ({self.model_id})...")
@@ -85,13 +103,30 @@ class QwenVisionAgent:
             kwargs = {
                 "pretrained_model_name_or_path": self.model_id,
                 "low_cpu_mem_usage": True,
+                # Fused SDPA kernels (Flash/mem-efficient on GPU) for the long vision-token prefill
+                "attn_implementation": "sdpa",
             }
 
             # Check if user wants to force GPU (can be useful if basic check fails but path exists)
             force_gpu = os.getenv("SpandaOS_FORCE_GPU", "false").lower() == "true"
             use_cuda = torch.cuda.is_available() or force_gpu
 
-            if use_cuda:
+            # Quantization policy: auto | nf4 | fp16
+            # A 2B model fits in ~4.5GB as fp16, where NF4's per-matmul dequant is pure
+            # overhead. 'auto' only quantizes when free VRAM can't hold fp16 weights.
+            quant_mode = os.getenv("SpandaOS_QWEN_QUANT", "auto").lower()
+            try:
+                vram_free_gb = torch.cuda.mem_get_info()[0] / 1024**3 if use_cuda else 0.0
+            except Exception:
+                vram_free_gb = 0.0
+            use_fp16 = quant_mode == "fp16" or (quant_mode == "auto" and vram_free_gb >= FP16_MIN_FREE_VRAM_GB)
+
+            if use_cuda and use_fp16:
+                kwargs["torch_dtype"] = torch.float16
+                kwargs["device_map"] = {"": 0}
+                logger.info(f"GPU Mode Enabled: Using fp16 weights, no quantization ({vram_free_gb:.1f}GB free).")
+                self.device = "cuda"
+            elif use_cuda:
                 from transformers import BitsAndBytesConfig
                 # 4-bit quantization config for 6GB VRAM
                 bnb_config = BitsAndBytesConfig(
@@ -103,12 +138,11 @@ class QwenVisionAgent:
                 kwargs["quantization_config"] = bnb_config
                 kwargs["device_map"] = "auto"
                 # Dynamic max memory based on actual VRAM
-                try:
-                    vram_free, _ = torch.cuda.mem_get_info()
+                if vram_free_gb > 0:
                     # Leave 1.5GB for system/overhead, cap model at remaining
-                    safe_vram = f"{max(2.0, (vram_free/1024**3) - 1.5):.1f}GiB"
+                    safe_vram = f"{max(2.0, vram_free_gb - 1.5):.1f}GiB"
                     kwargs["max_memory"] = {0: safe_vram, "cpu": "24GiB"}
-                except:
+                else:
                     kwargs["max_memory"] = {0: "4GiB", "cpu": "24GiB"}
                 
                 logger.info(f"GPU Mode Enabled: Using 4-bit quantization (Cap: {kwargs.get('max_memory', {}).get(0, '4GiB')}).")
@@ -126,6 +160,9 @@ class QwenVisionAgent:
             actual_device = next(self.model.parameters()).device
             logger.info(f"Qwen2-VL-2B loaded successfully on {actual_device}.")
             self.device = str(actual_device)
+
+            if use_cuda:
+                self._maybe_compile_decode()
         except ImportError as e:
             logger.error(f"Missing dependency for Qwen2-VL: {e}. Please run 'pip install qwen-vl-utils accelerate bitsandbytes'")
             raise
@@ -143,37 +180,83 @@ class QwenVisionAgent:
                 logger.error("HINT: This usually happens when bitsandbytes quantization is attempted on a CPU-only machine.")
             raise
 
+    def _maybe_compile_decode(self):
+        """
+        Opt-in (SpandaOS_QWEN_COMPILE=true): static KV cache + torch.compile of the
+        decoder forward. Fixed-shape K/V buffers let 'reduce-overhead' capture each
+        decode step as a CUDA graph, removing per-token allocator and launch cost.
+        Off by default — first-call compilation is slow and not every
+        torch/transformers/bitsandbytes combination supports it.
+        """
+        if os.getenv("SpandaOS_QWEN_COMPILE", "false").lower() != "true":
+            return
+        original_forward = self.model.forward
+        original_cache = getattr(self.model.generation_config, "cache_implementation", None)
+        try:
+            import torch
+            self.model.generation_config.cache_implementation = "static"
+            self.model.forward = torch.compile(original_forward, mode="reduce-overhead", dynamic=False)
+            # torch.compile is lazy: Dynamo/Inductor and static-cache errors only surface
+            # on the first call. A tiny text-only generate (prefill + one decode step)
+            # triggers them here, where we can still fall back.
+            warmup = self.processor(text=["warmup"], return_tensors="pt")
+            device = next(self.model.parameters()).device
+            warmup = {k: v.to(device) if isinstance(v, torch.Tensor) else v for k, v in warmup.items()}
+            with torch.inference_mode():
+                self.model.generate(**warmup, max_new_tokens=2, do_sample=False)
+            logger.info("Qwen2-VL: Static KV cache + torch.compile(reduce-overhead) enabled for decode.")
+        except Exception as e:
+            logger.warning(f"Qwen2-VL: torch.compile warm-up failed, using eager decode ({e})")
+            self.model.forward = original_forward
+            self.model.generation_config.cache_implementation = original_cache
+
+    def _render_chat_template(self, messages: List[Dict], prompt: str) -> str:
+        """Jinja render of the single-image + prompt message, memoized per prompt."""
+        text = self._template_cache.get(prompt)
+        if text is None:
+            text = self.processor.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+            if len(self._template_cache) >= 128:
+                self._template_cache.clear()
+            self._template_cache[prompt] = text
+        return text
+
     async def describe_image(self, pil_image: Image.Image, prompt: str = None) -> str:
-        """Generate a description for an image."""
-        self._lazy_load()
-        
+        """
+        Generate a description for an image.
+        Load + generate + decode run on a worker thread so the event loop keeps serving
+        token streams meanwhile; the lock keeps one generation on the GPU at a time.
+        """
         if prompt is None:
             prompt = (
                 "Describe this image in great detail. Focus on the main subject, "
                 "colors, textures, and any visible text."
             )
 
-        import tempfile
-        import os
+        if self._gpu_lock is None:
+            self._gpu_lock = asyncio.Lock()
+        async with self._gpu_lock:
+            return await asyncio.to_thread(self._describe_image_sync, pil_image, prompt)
+
+    def _describe_image_sync(self, pil_image: Image.Image, prompt: str) -> str:
+        """Blocking Qwen2-VL inference (called via asyncio.to_thread)."""
+        self._lazy_load()
+
+        import torch
         from qwen_vl_utils import process_vision_info
         
-        # Save to temp file
-        with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tmp:
-            tmp_path = tmp.name
-            pil_image.convert("RGB").save(tmp_path, "JPEG", quality=95)
+        # qwen_vl_utils accepts PIL images directly — no JPEG encode/decode round-trip via disk
+        rgb_image = pil_image if pil_image.mode == "RGB" else pil_image.convert("RGB")
 
         try:
-            # Clear cache before heavy work
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
-                
+            # NOTE: no torch.cuda.empty_cache() here — it forces a device sync and hands cached
+            # blocks back to the driver, only for generate() to re-request them immediately.
             messages = [
                 {
                     "role": "user",
                     "content": [
                         {
                             "type": "image", 
-                            "image": f"file://{tmp_path}",
+                            "image": rgb_image,
                             "min_pixels": 256 * 28 * 28,
                             "max_pixels": 1280 * 28 * 28,
                         },
@@ -182,7 +265,7 @@ class QwenVisionAgent:
                 }
             ]
 
-            text = self.processor.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+            text = self._render_chat_template(messages, prompt)
             image_inputs, video_inputs = process_vision_info(messages)
             
             # Memory safe processor call
@@ -199,7 +282,7 @@ class QwenVisionAgent:
             inputs = {k: v.to(device) if isinstance(v, torch.Tensor) else v for k, v in inputs.items()}
 
             # Inference with memory-conscious settings
-            with torch.no_grad():
+            with torch.inference_mode():
                 logger.info(f"Qwen2-VL: Running inference on {device}...")
                 generated_ids = self.model.generate(
                     **inputs, 
@@ -228,10 +311,6 @@ class QwenVisionAgent:
             import traceback
             logger.error(traceback.format_exc())
             return f"Error during vision perception: {str(e)}"
-        finally:
-            if os.path.exists(tmp_path):
-                try: os.remove(tmp_path)
-                except: pass
 
 # Singleton instance for the pipeline
 _vision_agent = None